@@ -0,0 +1,4 @@
+# 루틴 엔진 벤치마크 (저장소 루트에서 실행)
+#   python -m benchmarks.synthetic 1000 10000        데이터셋만 생성 (benchmarks/data/)
+#   python -m benchmarks.run --sizes 1000 10000      측정 후 benchmarks/results/<커밋>-<backend>.json에 저장
+#   python -m benchmarks.run --compare benchmarks/results/abc1234-journal.json
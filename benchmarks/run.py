@@ -0,0 +1,243 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from routine_core import RoutineStore, make_backend
+from routine_core.recurrence import RecurrenceIndex, matches
+
+from .synthetic import BASE_DATE, SIZES, ensure_dataset
+
+# 결과 파일을 두는 폴더
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+# 하루 조회를 몇 날짜에 걸쳐 잴지
+QUERY_DAYS = 30
+
+# 추가/수정/삭제를 각각 몇 번 할지 (변경마다 바로 저장)
+ROUND_TRIPS = 20
+
+BACKEND_SUFFIXES = {"json": ".json", "journal": ".json", "sqlite": ".db", "binary": ".rtb"}
+
+
+def _git_commit():
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=root,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=root,
+                               capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None, False
+    return commit, bool(dirty)
+
+
+# fn을 repeat번 실행해서 걸린 시간(초) 목록을 돌려줌
+# setup이 있으면 매번 실행 전에 호출하고, 그 반환값을 fn에 넘김 (시간에는 포함하지 않음)
+def _measure(fn, repeat, setup=None):
+    times = []
+    for _ in range(repeat):
+        arg = setup() if setup else None
+        start = time.perf_counter()
+        fn(arg) if setup else fn()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+# 데이터셋을 작업 폴더에 복사해서 backend 형식으로 만들어 둠
+def _prepare(source, workdir, kind):
+    path = os.path.join(workdir, "data" + BACKEND_SUFFIXES[kind])
+    for name in os.listdir(workdir):
+        os.remove(os.path.join(workdir, name))
+    if kind in ("sqlite", "binary"):
+        data = make_backend(source, "json").load()
+        backend = make_backend(path, kind)
+        backend.save(data)
+        _close(backend)
+    else:
+        shutil.copyfile(source, path)
+    return path
+
+
+def _close(backend):
+    if hasattr(backend, "close"):
+        backend.close()
+
+
+# 한 크기에 대한 벤치마크 묶음, (이름, 걸린 시간 목록, 한 번에 처리한 횟수)를 차례로 내보냄
+def run_size(source, workdir, kind, repeat):
+    path = _prepare(source, workdir, kind)
+    backend = make_backend(path, kind)
+    data = backend.load()
+    yield "load", _measure(backend.load, repeat), 1
+    routines = data["routines"]
+    yield "index_build", _measure(lambda: RecurrenceIndex().rebuild(routines), repeat), 1
+    yield "save", _measure(lambda: backend.save(data), repeat), 1
+    _close(backend)
+
+    path = _prepare(source, workdir, kind)
+    store = RoutineStore(path, backend=make_backend(path, kind))
+    days = [(BASE_DATE + timedelta(days=i)).isoformat() for i in range(QUERY_DAYS)]
+
+    def query_days():
+        for day in days:
+            store.routines_on(day)
+
+    yield "query_day", _measure(query_days, repeat), len(days)
+
+    # 인덱스 없이 전체 루틴을 훑는 속도 (루틴 하나당 빈도/시작일/시간 읽기)
+    def scan():
+        day = days[0]
+        return sum(1 for routine in store.routines if matches(routine, day))
+
+    yield "scan", _measure(scan, repeat), len(store.routines)
+
+    try:
+        from routine_core.occurrences import RoutineColumns, occurrences
+    except ImportError:
+        print("  numpy가 없어 기간 전개는 건너뜀", file=sys.stderr)
+    else:
+        yield "range_columns", _measure(lambda: RoutineColumns(store.routines), repeat), 1
+        columns = RoutineColumns(store.routines)
+        month_end = BASE_DATE + timedelta(days=30)
+        year_end = BASE_DATE + timedelta(days=364)
+        yield "range_30d", _measure(lambda: occurrences(columns, BASE_DATE, month_end).counts(), repeat), 1
+        yield "range_365d", _measure(lambda: occurrences(columns, BASE_DATE, year_end).counts(), repeat), 1
+
+        from routine_core.analytics import Analytics
+
+        # 1년 통계: 캐시 없이 처음 계산할 때와 달별 집계 캐시를 쓸 때
+        def stats_cold():
+            analytics = Analytics(store)
+            analytics.stats(BASE_DATE, year_end)
+            analytics.close()
+
+        yield "stats_365d", _measure(stats_cold, repeat), 1
+        analytics = Analytics(store)
+        analytics.stats(BASE_DATE, year_end)
+        yield "stats_365d_warm", _measure(lambda: analytics.stats(BASE_DATE, year_end), repeat), 1
+        analytics.close()
+
+    def add_routines():
+        return [store.add_routine({"time": "09:00", "content": f"벤치마크 {i}", "frequency": "daily",
+                                   "start_date": BASE_DATE.isoformat()}).id
+                for i in range(ROUND_TRIPS)]
+
+    yield "add", _measure(add_routines, repeat), ROUND_TRIPS
+    ids = [routine.id for routine in store.routines[:ROUND_TRIPS]]
+
+    def update_routines():
+        for routine_id in ids:
+            store.update_routine(routine_id, time="10:30")
+
+    yield "update", _measure(update_routines, repeat), len(ids)
+
+    def delete_routines(targets):
+        for routine_id in targets:
+            store.delete_routine(routine_id)
+
+    yield "delete", _measure(delete_routines, repeat, setup=add_routines), ROUND_TRIPS
+    store.flush()
+    _close(store.backend)
+
+
+# 저장소를 연 뒤 메모리에 남은 크기 (바이트, tracemalloc 기준)
+def measure_memory(source, workdir, kind):
+    path = _prepare(source, workdir, kind)
+    tracemalloc.start()
+    try:
+        store = RoutineStore(path, backend=make_backend(path, kind))
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    _close(store.backend)
+    return current, peak
+
+
+def run(sizes, kind, repeat, seed=0):
+    commit, dirty = _git_commit()
+    report = {
+        "commit": commit,
+        "dirty": dirty,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "backend": kind,
+        "repeat": repeat,
+        "seed": seed,
+        "results": [],
+        "memory": [],
+    }
+    workdir = tempfile.mkdtemp(prefix="routine-bench-")
+    try:
+        for size in sizes:
+            source = ensure_dataset(size, seed)
+            for name, times, ops in run_size(source, workdir, kind, repeat):
+                result = {
+                    "size": size,
+                    "name": name,
+                    "ops": ops,
+                    "min_s": min(times),
+                    "median_s": statistics.median(times),
+                }
+                report["results"].append(result)
+                print(f"{size:>9} {name:<14} {result['min_s'] * 1000:10.2f} ms"
+                      f"  ({result['min_s'] / ops * 1e6:10.1f} us/op)")
+            current, peak = measure_memory(source, workdir, kind)
+            report["memory"].append({"size": size, "current_bytes": current, "peak_bytes": peak})
+            print(f"{size:>9} {'memory':<14} {current / 2**20:10.1f} MB  (최대 {peak / 2**20:.1f} MB,"
+                  f" 루틴당 {current / size:.0f} B)")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return report
+
+
+# 이전 결과와 비교 (1보다 크면 느려짐)
+def compare(report, baseline):
+    previous = {(r["size"], r["name"]): r["min_s"] for r in baseline["results"]}
+    print(f"\n{baseline.get('commit')} 대비 (min 기준, >1 이면 느려짐)")
+    for result in report["results"]:
+        before = previous.get((result["size"], result["name"]))
+        if before:
+            print(f"{result['size']:>9} {result['name']:<14} x{result['min_s'] / before:6.2f}")
+    memory = {m["size"]: m["current_bytes"] for m in baseline.get("memory", [])}
+    for m in report.get("memory", []):
+        before = memory.get(m["size"])
+        if before:
+            print(f"{m['size']:>9} {'memory':<14} x{m['current_bytes'] / before:6.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="루틴 엔진 벤치마크")
+    parser.add_argument("--sizes", nargs="+", type=int, default=list(SIZES))
+    parser.add_argument("--backend", choices=sorted(BACKEND_SUFFIXES), default="journal")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", help="결과 JSON 경로 (기본: benchmarks/results/<커밋>-<backend>.json)")
+    parser.add_argument("--compare", help="비교할 이전 결과 JSON")
+    args = parser.parse_args(argv)
+
+    report = run(args.sizes, args.backend, args.repeat, args.seed)
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        name = (report["commit"] or "unknown") + ("-dirty" if report["dirty"] else "")
+        output = os.path.join(RESULTS_DIR, f"{name}-{args.backend}.json")
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=4)
+    print(f"\n결과 저장: {output}")
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            compare(report, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+import argparse
+import json
+import os
+import random
+from collections import Counter
+from datetime import date, timedelta
+
+from routine_core.storage import DATA_FILE, atomic_write_json, empty_data
+
+# 기본 데이터 크기 (루틴 수)
+SIZES = (1_000, 10_000, 100_000, 1_000_000)
+
+# 생성한 데이터를 두는 폴더
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+
+# 생성 기준일 (결과가 실행 날짜에 따라 달라지지 않도록 고정)
+BASE_DATE = date(2025, 1, 1)
+
+# 템플릿 파일이 없을 때 쓰는 빈도 비율 (번들 data.json과 같은 비율)
+DEFAULT_WEIGHTS = {"daily": 13, "once": 4, "weekly": 2, "monthly": 1}
+
+
+# 템플릿 data.json에서 빈도 비율, 시간, 내용 목록을 뽑음
+def load_template(path=DATA_FILE):
+    routines = []
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            routines = json.load(f).get("routines", [])
+    weights = Counter(r["frequency"] for r in routines) or Counter(DEFAULT_WEIGHTS)
+    times = [r["time"] for r in routines] or ["09:00"]
+    contents = [r["content"] for r in routines] or ["루틴"]
+    return weights, times, contents
+
+
+# count개의 루틴을 만듦 (seed가 같으면 항상 같은 데이터)
+# - 빈도 비율은 템플릿을 따르고, 시간은 절반은 템플릿 시간, 나머지는 06~22시 15분 단위
+# - 반복 루틴은 기준일 전 1년 안에서 시작, once는 기준일 앞뒤 1년 안의 하루
+def generate(count, seed=0, template=DATA_FILE):
+    weights, times, contents = load_template(template)
+    rng = random.Random(seed)
+    frequencies = rng.choices(list(weights), weights=list(weights.values()), k=count)
+    routines = []
+    for i, frequency in enumerate(frequencies):
+        if rng.random() < 0.5:
+            time = rng.choice(times)
+        else:
+            time = f"{rng.randint(6, 22):02d}:{rng.choice((0, 15, 30, 45)):02d}"
+        if frequency == "once":
+            start = BASE_DATE + timedelta(days=rng.randint(-365, 365))
+        elif frequency == "monthly":
+            month = BASE_DATE.month - 1 - rng.randint(0, 11)
+            start = date(BASE_DATE.year + month // 12, month % 12 + 1, rng.randint(1, 28))
+        else:
+            start = BASE_DATE - timedelta(days=rng.randint(0, 365))
+        routine = {
+            "id": f"{rng.getrandbits(128):032x}",
+            "time": time,
+            "content": f"{rng.choice(contents)} {i}",
+            "frequency": frequency,
+            "start_date": start.isoformat(),
+        }
+        if frequency == "once":
+            routine["dates"] = [routine["start_date"]]
+        routines.append(routine)
+    return dict(empty_data(), routines=routines)
+
+
+def dataset_path(count, seed=0):
+    return os.path.join(DATA_DIR, f"routines-{count}-{seed}.json")
+
+
+# 데이터 파일을 만들어 두고 경로를 돌려줌 (이미 있으면 그대로 사용)
+def ensure_dataset(count, seed=0, template=DATA_FILE):
+    path = dataset_path(count, seed)
+    if not os.path.exists(path):
+        os.makedirs(DATA_DIR, exist_ok=True)
+        atomic_write_json(path, generate(count, seed, template))
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="벤치마크용 data.json 생성")
+    parser.add_argument("sizes", nargs="*", type=int, default=list(SIZES))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--template", default=DATA_FILE, help="빈도 비율/시간/내용을 가져올 data.json")
+    args = parser.parse_args(argv)
+    for count in args.sizes:
+        print(ensure_dataset(count, args.seed, args.template))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+import argparse
+import csv
+import json
+import re
+import sys
+from datetime import date, datetime
+
+from routine_core import DATA_FILE, RoutineStore, instrument, make_backend
+from routine_core import ics
+from routine_core.completion import occurrence_completed
+from routine_core.model import FREQUENCIES, is_valid_time, make_routine, time_key
+from routine_core.search import DEFAULT_LIMIT, SearchIndex
+from routine_core.storage import plain_data
+
+# 내보내기/가져오기에 쓰는 기본 필드
+FIELDS = ["id", "time", "content", "frequency", "start_date", "dates"]
+
+
+def _date(value):
+    try:
+        return date.fromisoformat(value).isoformat()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"날짜 형식이 올바르지 않습니다: {value}")
+
+
+# source: 완료 여부를 읽을 저장소 (day를 줄 때만 필요)
+def _format(routine, day=None, source=None):
+    mark = ""
+    if day is not None:
+        mark = "[x] " if occurrence_completed(source, routine, day) else "[ ] "
+    return f"{mark}{routine.time} - {routine.content} ({routine.frequency})"
+
+
+def cmd_list(args):
+    backend = make_backend(args.data)
+    if hasattr(backend, "routines_on"):
+        # SQLite는 전체를 읽지 않고 해당 날짜만 조회
+        source = backend
+        routines = sorted(backend.routines_on(args.date), key=time_key)
+    else:
+        source = RoutineStore(args.data, backend=backend)
+        routines = source.routines_on(args.date)
+    for routine in routines:
+        print(_format(routine, args.date, source))
+
+
+def cmd_agenda(args):
+    store = RoutineStore(args.data)
+    by_date = store.occurrences(args.start, args.end).by_date()
+    for day in sorted(by_date):
+        print(day)
+        for routine in sorted(by_date[day], key=time_key):
+            print("  " + _format(routine, day, store))
+
+
+def cmd_add(args):
+    store = RoutineStore(args.data)
+    if not is_valid_time(args.time):
+        raise SystemExit("시간 형식이 올바르지 않습니다.")
+    routine = store.add_routine(make_routine(args.time, args.content, args.frequency, args.date))
+    print(routine.id)
+
+
+# 가져온 한 줄을 루틴 레코드로 변환 (형식이 틀리면 ValueError)
+def _parse_record(record):
+    time = record.get("time") or ""
+    content = record.get("content") or ""
+    frequency = record.get("frequency") or "once"
+    start_date = record.get("start_date") or record.get("date") or ""
+    if not time or not content:
+        raise ValueError("time, content 값이 필요합니다.")
+    if not is_valid_time(time):
+        raise ValueError(f"시간 형식이 올바르지 않습니다: {time}")
+    date.fromisoformat(start_date)
+    routine = make_routine(time, content, frequency, start_date)
+    dates = record.get("dates")
+    if dates and frequency == "once":
+        if isinstance(dates, str):
+            dates = [d for d in dates.split(";") if d]
+        routine.dates = [date.fromisoformat(d).isoformat() for d in dates]
+    if record.get("id"):
+        routine.id = str(record["id"])
+    return routine
+
+
+def _read_records(path):
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        if path.endswith(".csv"):
+            for lineno, row in enumerate(csv.DictReader(f), start=2):
+                yield lineno, row
+        else:
+            for lineno, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    yield lineno, json.loads(line)
+                except ValueError as e:
+                    raise SystemExit(f"{path}:{lineno}: {e}")
+
+
+def cmd_bulk_import(args):
+    store = RoutineStore(args.data)
+    if args.file.endswith(".ics"):
+        # iCalendar는 한 줄씩 읽으면서 ics.BATCH_SIZE개씩 저장
+        with open(args.file, 'r', encoding='utf-8-sig', newline='') as f:
+            added, skipped = ics.import_ics(store, f)
+        for reason, count in skipped.most_common():
+            print(f"건너뜀 ({reason}): {count}개", file=sys.stderr)
+        print(f"{added}개 추가")
+        return
+    routines = []
+    for lineno, record in _read_records(args.file):
+        try:
+            routines.append(_parse_record(record))
+        except ValueError as e:
+            raise SystemExit(f"{args.file}:{lineno}: {e}")
+    # 모두 검사한 뒤 한 번에 저장
+    with store.batch():
+        for routine in routines:
+            if store.get(routine.id) is not None:
+                routine.id = None
+            store.add_routine(routine)
+    print(f"{len(routines)}개 추가")
+
+
+def cmd_stats(args):
+    from routine_core.analytics import Analytics, summary_lines
+
+    stats = Analytics(RoutineStore(args.data)).stats(args.start, args.end)
+    for line in summary_lines(stats, args.top):
+        print(line)
+
+
+def cmd_search(args):
+    store = RoutineStore(args.data)
+    for routine, score, due in SearchIndex(store).search(args.query, args.limit):
+        when = due.strftime("%Y-%m-%d %H:%M") if due else "-"
+        print(f"{when}  {_format(routine)}  [{score:.2f}]")
+
+
+def cmd_delete(args):
+    store = RoutineStore(args.data)
+    if args.regex:
+        pattern = re.compile(args.match)
+        matched = lambda content: pattern.search(content) is not None
+    else:
+        matched = lambda content: args.match in content
+    targets = [r for r in store.routines
+               if matched(r.content) and (args.frequency is None or r.frequency == args.frequency)]
+    if args.dry_run:
+        for routine in targets:
+            print(_format(routine))
+        print(f"{len(targets)}개 삭제 예정")
+        return
+    with store.batch():
+        for routine in targets:
+            store.delete_routine(routine.id)
+    print(f"{len(targets)}개 삭제")
+
+
+def cmd_export(args):
+    store = RoutineStore(args.data)
+    out = open(args.output, 'w', encoding='utf-8', newline='') if args.output else sys.stdout
+    try:
+        if args.format == "json":
+            json.dump(plain_data(store.data), out, ensure_ascii=False, indent=4)
+            out.write("\n")
+        elif args.format == "ics":
+            count = ics.write_ics(store.routines, out)
+            print(f"{count}개 일정 내보냄", file=sys.stderr)
+        elif args.format == "jsonl":
+            for routine in store.routines:
+                out.write(json.dumps(routine.to_dict(), ensure_ascii=False) + "\n")
+        else:
+            writer = csv.DictWriter(out, fieldnames=FIELDS, extrasaction='ignore')
+            writer.writeheader()
+            for routine in store.routines:
+                writer.writerow(dict(routine.to_dict(), dates=";".join(routine.dates or [])))
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+# 저장 형식 변환 (확장자로 형식 결정: .json, .rtb, .db)
+def cmd_convert(args):
+    data = make_backend(args.source).load()
+    data.pop("journal_seq", None)
+    target = make_backend(args.target)
+    target.save(data)
+    if hasattr(target, "close"):
+        target.close()
+    print(f"{len(data['routines'])}개 루틴을 {args.target}(으)로 저장")
+
+
+def cmd_migrate_sqlite(args):
+    from routine_core.sqlite_backend import migrate_json_to_sqlite
+
+    count = migrate_json_to_sqlite(args.sources, args.target)
+    print(f"{count}개 루틴을 {args.target}(으)로 옮김")
+
+
+def build_parser():
+    today = datetime.now().strftime("%Y-%m-%d")
+    parser = argparse.ArgumentParser(prog="routine_cli", description="루틴 관리 명령줄 도구")
+    parser.add_argument("--data", default=DATA_FILE, help="데이터 파일 경로 (.db/.sqlite는 SQLite, .rtb는 바이너리)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    p = commands.add_parser("list", help="해당 날짜의 루틴 목록")
+    p.add_argument("--date", type=_date, default=today)
+    p.set_defaults(func=cmd_list)
+
+    p = commands.add_parser("agenda", help="기간별 루틴 목록")
+    p.add_argument("--from", dest="start", type=_date, default=today)
+    p.add_argument("--to", dest="end", type=_date, required=True)
+    p.set_defaults(func=cmd_agenda)
+
+    p = commands.add_parser("add", help="루틴 추가")
+    p.add_argument("--time", required=True, help="HH:MM")
+    p.add_argument("--content", required=True)
+    p.add_argument("--frequency", choices=FREQUENCIES, default="once")
+    p.add_argument("--date", type=_date, default=today, help="시작일 (once는 해당 날짜)")
+    p.set_defaults(func=cmd_add)
+
+    p = commands.add_parser("bulk-import", help="CSV/JSONL 파일에서 한 번에 추가")
+    p.add_argument("file", help=".csv (헤더: time,content,frequency,start_date[,dates]), .jsonl 또는 .ics")
+    p.set_defaults(func=cmd_bulk_import)
+
+    p = commands.add_parser("search", help="내용으로 루틴 검색 (초성 검색 가능, 예: ㅇㄷ)")
+    p.add_argument("query")
+    p.add_argument("--limit", type=int, default=DEFAULT_LIMIT)
+    p.set_defaults(func=cmd_search)
+
+    p = commands.add_parser("stats", help="기간별 완료율, 연속 완료, 바쁜 시간대/요일")
+    p.add_argument("--from", dest="start", type=_date, default=f"{today[:4]}-01-01")
+    p.add_argument("--to", dest="end", type=_date, default=today)
+    p.add_argument("--top", type=int, default=5)
+    p.set_defaults(func=cmd_stats)
+
+    p = commands.add_parser("delete", help="내용이 일치하는 루틴 삭제")
+    p.add_argument("--match", required=True, help="내용에 포함된 문자열")
+    p.add_argument("--regex", action="store_true", help="--match를 정규식으로 해석")
+    p.add_argument("--frequency", choices=FREQUENCIES)
+    p.add_argument("--dry-run", action="store_true", help="삭제하지 않고 대상만 출력")
+    p.set_defaults(func=cmd_delete)
+
+    p = commands.add_parser("export", help="루틴 내보내기")
+    p.add_argument("--format", choices=["json", "jsonl", "csv", "ics"], default="json")
+    p.add_argument("-o", "--output", help="출력 파일 (생략 시 표준 출력)")
+    p.set_defaults(func=cmd_export)
+
+    p = commands.add_parser("convert", help="다른 저장 형식으로 변환 (예: data.json -> data.rtb)")
+    p.add_argument("source")
+    p.add_argument("target", help=".json(JSON), .rtb(바이너리), .db(SQLite)")
+    p.set_defaults(func=cmd_convert)
+
+    p = commands.add_parser("migrate-sqlite", help="data.json 파일들을 SQLite 파일로 옮기기")
+    p.add_argument("sources", nargs="+", help="data.json 경로들 (예: data.json dist/data.json)")
+    p.add_argument("--to", dest="target", required=True, help="만들 SQLite 파일 (.db)")
+    p.set_defaults(func=cmd_migrate_sqlite)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    instrument.configure_from_env()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,13 @@
+from .storage import DATA_FILE, JournalBackend, JsonFileBackend, load_data, make_backend, save_data
+from .store import RoutineStore, get_store
+
+__all__ = [
+    "DATA_FILE",
+    "JournalBackend",
+    "JsonFileBackend",
+    "RoutineStore",
+    "get_store",
+    "load_data",
+    "make_backend",
+    "save_data",
+]
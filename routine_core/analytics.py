@@ -0,0 +1,323 @@
+from collections import OrderedDict
+from datetime import date
+
+import numpy as np
+
+from .instrument import span
+from .occurrences import RoutineColumns, occurrences
+
+# 루틴 통계: 기간별 완료율, 연속 완료(streak), 시간대/요일별 부하
+# - 발생 내역(occurrences.py)을 달 단위로 펼쳐서 numpy로 한 번에 집계 (날짜마다 루틴 목록을 만들지 않음)
+# - 완료 여부는 루틴마다의 완료 비트셋(completion.py)을 바이트 배열 하나로 이어 붙여 두고 발생마다 조회
+# - 한 달 전체를 덮는 구간의 집계는 캐시해 두고, 여러 해의 통계는 달별 집계를 이어 붙여서 구함
+#   연속 완료는 달마다 (앞쪽 연속, 뒤쪽 연속, 가장 긴 연속)을 들고 있다가 이어 붙일 때 합침
+# - 완료 표시를 바꾸면 그 날짜가 든 달만 다시 계산하고, 루틴을 추가/수정/삭제하거나 파일을 다시 읽으면 전부 다시 계산
+
+WEEKDAYS = ("월", "화", "수", "목", "금", "토", "일")
+HOURS = 24
+
+# 캐시해 두는 달 수 (달마다 루틴 수 * 10바이트 정도)
+MONTH_CACHE_SIZE = 60
+
+_EPOCH = date(1970, 1, 1).toordinal()
+# 1970-01-01은 목요일 (월요일 = 0)
+_EPOCH_WEEKDAY = 3
+
+
+def _epoch_day(value):
+    day = date.fromisoformat(value) if isinstance(value, str) else value
+    return day.toordinal() - _EPOCH
+
+
+# first~last(포함, 1970-01-01 기준 일수)를 달 단위로 나눔: (시작, 끝, 달 전체면 (연, 월) 아니면 None)
+def _month_ranges(first, last):
+    while first <= last:
+        day = date.fromordinal(first + _EPOCH)
+        following = date(day.year + 1, 1, 1) if day.month == 12 else date(day.year, day.month + 1, 1)
+        month_last = following.toordinal() - _EPOCH - 1
+        end = min(month_last, last)
+        whole = day.day == 1 and end == month_last
+        yield first, end, (day.year, day.month) if whole else None
+        first = end + 1
+
+
+# 루틴들의 완료 비트셋을 이어 붙인 바이트 배열: (시작 비트 위치, 비트 수, 바이트 배열)
+# 시작일이 틀린 루틴은 완료 기록이 없는 것으로 봄 (completion.is_completed와 같음)
+def _completion_bits(routines):
+    base = []
+    length = []
+    chunks = []
+    offset = 0
+    for routine in routines:
+        value = int(routine.completed, 16) if routine.completed and routine.start is not None else 0
+        size = (value.bit_length() + 7) // 8
+        if size:
+            chunks.append(value.to_bytes(size, 'little'))
+        base.append(offset * 8)
+        length.append(size * 8)
+        offset += size
+    packed = np.frombuffer(b"".join(chunks), dtype=np.uint8).copy()
+    return np.array(base, dtype=np.int64), np.array(length, dtype=np.int64), packed
+
+
+# 루틴마다 (원래 루틴 번호 src 기준으로 정렬된) 완료 여부 done에서
+# 앞쪽 연속 완료 수, 뒤쪽 연속 완료 수, 가장 긴 연속 완료 수
+def _streaks(src, done, count):
+    prefix = np.zeros(count, dtype=np.int64)
+    suffix = np.zeros(count, dtype=np.int64)
+    longest = np.zeros(count, dtype=np.int64)
+    if not len(src):
+        return prefix, suffix, longest
+    first = np.empty(len(src), dtype=bool)
+    first[0] = True
+    first[1:] = src[1:] != src[:-1]
+    # 루틴이 바뀌거나 빠뜨린 발생에서 새 구간을 시작하고, 구간마다 완료한 발생 수를 셈
+    breaks = first | ~done
+    starts = np.flatnonzero(breaks)
+    runs = np.diff(starts, append=len(src)) - ~done[starts]
+    group_starts = np.flatnonzero(first[starts])
+    groups = src[first]
+    longest[groups] = np.maximum.reduceat(runs, group_starts)
+    prefix[groups] = np.where(done[first], runs[group_starts], 0)
+    suffix[groups] = runs[np.append(group_starts[1:] - 1, len(runs) - 1)]
+    return prefix, suffix, longest
+
+
+# values(0 이상 size 미만)의 값마다 (발생 수, 완료한 발생 수)
+def _count_pairs(values, done, size):
+    pairs = np.bincount(values * 2 + done, minlength=size * 2).reshape(size, 2)
+    return pairs.sum(axis=1), pairs[:, 1]
+
+
+# 기간 통계 (루틴별 배열은 routines 순서, 복사본이 아닌 원래 루틴 기준)
+# - scheduled/done: 루틴별 예정된 발생 수/완료한 발생 수
+# - streak: 기간 끝에서부터 거꾸로 연속 완료한 발생 수 (기간 밖은 보지 않음)
+# - longest_streak: 기간 안에서 가장 길게 연속 완료한 발생 수
+# - heatmap/heatmap_done[요일(월=0), 시]: 예정/완료한 발생 수 (시간 형식이 틀린 발생은 뺌)
+# - daily_scheduled/daily_done: start부터 하루 단위 예정/완료 수
+class Stats:
+    def __init__(self, routines, start, end, scheduled, done, prefix, streak, longest_streak,
+                 heatmap, heatmap_done, daily_scheduled, daily_done):
+        self.routines = routines
+        self.start = start
+        self.end = end
+        self.scheduled = scheduled
+        self.done = done
+        self._prefix = prefix
+        self.streak = streak
+        self.longest_streak = longest_streak
+        self.heatmap = heatmap
+        self.heatmap_done = heatmap_done
+        self.daily_scheduled = daily_scheduled
+        self.daily_done = daily_done
+        self._rows = None
+
+    # 바로 뒤에 이어지는 기간의 통계 other와 합친 통계
+    def then(self, other):
+        whole = self.done == self.scheduled
+        other_whole = other.done == other.scheduled
+        return Stats(
+            self.routines, self.start, other.end,
+            np.add(self.scheduled, other.scheduled, dtype=np.int64),
+            np.add(self.done, other.done, dtype=np.int64),
+            np.where(whole, np.add(self._prefix, other._prefix, dtype=np.int64), self._prefix),
+            np.where(other_whole, np.add(self.streak, other.streak, dtype=np.int64), other.streak),
+            np.maximum(np.maximum(self.longest_streak, other.longest_streak),
+                       np.add(self.streak, other._prefix, dtype=np.int64)),
+            self.heatmap + other.heatmap,
+            self.heatmap_done + other.heatmap_done,
+            np.concatenate([self.daily_scheduled, other.daily_scheduled]),
+            np.concatenate([self.daily_done, other.daily_done]),
+        )
+
+    # 루틴별 완료율 (예정된 발생이 없으면 nan)
+    def rates(self):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(self.scheduled > 0, self.done / self.scheduled, np.nan)
+
+    # 전체 완료율 (예정된 발생이 없으면 None)
+    def completion_rate(self):
+        total = int(self.scheduled.sum())
+        return int(self.done.sum()) / total if total else None
+
+    @property
+    def by_hour(self):
+        return self.heatmap.sum(axis=0)
+
+    @property
+    def by_weekday(self):
+        return self.heatmap.sum(axis=1)
+
+    # 예정된 발생이 많은 시간대: [(시, 발생 수)]
+    def busiest_hours(self, count=3):
+        return _top(self.by_hour, count)
+
+    # 예정된 발생이 많은 요일: [(요일 이름, 발생 수)]
+    def busiest_weekdays(self, count=3):
+        return [(WEEKDAYS[day], total) for day, total in _top(self.by_weekday, count)]
+
+    # 현재 연속 완료가 긴 루틴: [(루틴, 연속 완료 수)]
+    def top_streaks(self, count=10):
+        return [(self.routines[row], total) for row, total in _top(self.streak, count)]
+
+    # 루틴 하나의 통계 (기간 안에 없는 루틴이면 None)
+    def for_routine(self, routine_id):
+        if self._rows is None:
+            self._rows = {routine.id: row for row, routine in enumerate(self.routines)}
+        row = self._rows.get(routine_id)
+        if row is None:
+            return None
+        scheduled, done = int(self.scheduled[row]), int(self.done[row])
+        return {
+            "scheduled": scheduled,
+            "done": done,
+            "rate": done / scheduled if scheduled else None,
+            "streak": int(self.streak[row]),
+            "longest_streak": int(self.longest_streak[row]),
+        }
+
+
+# 값이 큰 순서로 count개 (0은 뺌): [(위치, 값)]
+def _top(values, count):
+    count = min(count, len(values))
+    if count <= 0:
+        return []
+    rows = np.argpartition(-values, count - 1)[:count]
+    rows = rows[np.lexsort((rows, -values[rows]))]
+    return [(int(row), int(values[row])) for row in rows if values[row] > 0]
+
+
+# 사람이 읽는 통계 요약 (줄 목록)
+def summary_lines(stats, top=5):
+    rate = stats.completion_rate()
+    lines = [
+        f"기간: {stats.start} ~ {stats.end}",
+        f"예정 {int(stats.scheduled.sum())}회, 완료 {int(stats.done.sum())}회"
+        + (f" ({rate * 100:.1f}%)" if rate is not None else ""),
+        "바쁜 시간대: " + ", ".join(f"{hour:02d}시 {count}회" for hour, count in stats.busiest_hours(top)),
+        "바쁜 요일: " + ", ".join(f"{day} {count}회" for day, count in stats.busiest_weekdays(top)),
+        "연속 완료:",
+    ]
+    for routine, streak in stats.top_streaks(top):
+        lines.append(f"  {streak}회 - {routine.content} ({routine.frequency})")
+    return lines
+
+
+# 저장소의 루틴 통계 (달별 집계를 캐시하고 저장소 변경 알림으로 필요한 부분만 버림)
+class Analytics:
+    def __init__(self, store, cache_size=MONTH_CACHE_SIZE):
+        self.store = store
+        self.cache_size = cache_size
+        # RoutineColumns, None이면 아직 만들지 않음
+        self._columns = None
+        self._routines = None
+        self._rows = {}
+        self._hours = None
+        # 완료 비트 (_completion_bits), None이면 다시 만듦
+        self._bits = None
+        # {(연, 월): 그 달 전체의 Stats}
+        self._months = OrderedDict()
+        store.subscribe(self._on_store_change)
+
+    def close(self):
+        self.store.unsubscribe(self._on_store_change)
+
+    def _on_store_change(self, op):
+        if op is None or op["op"] != "complete":
+            self._columns = None
+            self._bits = None
+            self._months.clear()
+            return
+        day = date.fromisoformat(op["day"]) if isinstance(op["day"], str) else op["day"]
+        self._months.pop((day.year, day.month), None)
+        if self._bits is None:
+            return
+        # 이미 있는 비트 범위 안이면 그 비트만 고치고, 아니면 다음에 다시 만듦
+        row = self._rows.get(op["id"])
+        routine = self.store.get(op["id"])
+        if row is None or routine is None or routine.start is None:
+            self._bits = None
+            return
+        base, length, packed = self._bits
+        offset = day.toordinal() - routine.start
+        if not 0 <= offset < length[row]:
+            self._bits = None
+            return
+        position = base[row] + offset
+        if op["done"]:
+            packed[position >> 3] |= 1 << (position & 7)
+        else:
+            packed[position >> 3] &= ~(1 << (position & 7)) & 0xFF
+
+    def _ensure(self):
+        # 다른 프로세스가 파일을 바꿨으면 여기서 다시 읽고 알림(None)을 받음
+        self.store.check_external_changes()
+        if self._columns is None:
+            routines = self._routines = self.store.routines
+            self._columns = RoutineColumns(routines)
+            self._rows = {routine.id: row for row, routine in enumerate(routines)}
+            # 복사본(옮기거나 바꾼 발생)은 바뀐 시간 기준, 시간 형식이 틀리면 HOURS
+            self._hours = np.array([HOURS if routine.minutes is None else routine.minutes // 60
+                                    for routine in self._columns.routines], dtype=np.int64)
+        if self._bits is None:
+            self._bits = _completion_bits(self._routines)
+
+    # 발생(원래 루틴 번호, 1970-01-01 기준 일수)마다 완료 여부
+    def _completed(self, src, days):
+        base, length, packed = self._bits
+        offset = days - self._columns.start[src]
+        valid = (offset >= 0) & (offset < length[src])
+        position = base[src[valid]] + offset[valid]
+        done = np.zeros(len(days), dtype=bool)
+        done[valid] = (packed[position >> 3] >> (position & 7)) & 1
+        return done
+
+    # first~last(포함, 1970-01-01 기준 일수) 기간의 통계를 발생 내역에서 바로 계산
+    def _summarize(self, first, last):
+        columns = self._columns
+        count = columns.count
+        found = occurrences(columns, np.datetime64(first, 'D'), np.datetime64(last, 'D'))
+        src = columns.source[found.rows]
+        days = found.days
+        done = self._completed(src, days)
+
+        # (루틴, 날짜) 순서: 발생 내역은 빈도별로 이미 거의 정렬되어 있어서 안정 정렬(timsort)이 빠름
+        order = np.argsort(src * (last - first + 1) + (days - first), kind='stable')
+        prefix, suffix, longest = _streaks(src[order], done[order], count)
+
+        # 시간 형식이 틀린 발생은 HOURS 칸에 모았다가 버림
+        cells = ((days + _EPOCH_WEEKDAY) % 7) * (HOURS + 1) + self._hours[found.rows]
+        heatmap, heatmap_done = _count_pairs(cells, done, 7 * (HOURS + 1))
+        scheduled, completed = _count_pairs(src, done, count)
+        daily, daily_done = _count_pairs(days - first, done, last - first + 1)
+
+        # 달마다 캐시에 들고 있으므로 작은 정수형으로 줄임 (한 달 발생 수는 int16에 들어감)
+        small = np.int16
+        return Stats(
+            self._routines, date.fromordinal(first + _EPOCH), date.fromordinal(last + _EPOCH),
+            scheduled.astype(small), completed.astype(small),
+            prefix.astype(small), suffix.astype(small), longest.astype(small),
+            heatmap.reshape(7, HOURS + 1)[:, :HOURS], heatmap_done.reshape(7, HOURS + 1)[:, :HOURS],
+            daily.astype(np.int32), daily_done.astype(np.int32),
+        )
+
+    # start~end(포함) 기간의 통계 (날짜는 YYYY-MM-DD 문자열 또는 date)
+    def stats(self, start, end):
+        first, last = _epoch_day(start), _epoch_day(end)
+        if last < first:
+            raise ValueError(f"기간이 올바르지 않습니다: {start} ~ {end}")
+        with span("analytics.stats"):
+            self._ensure()
+            result = None
+            for lo, hi, key in _month_ranges(first, last):
+                part = self._months.get(key) if key is not None else None
+                if part is None:
+                    part = self._summarize(lo, hi)
+                    if key is not None:
+                        self._months[key] = part
+                        while len(self._months) > self.cache_size:
+                            self._months.popitem(last=False)
+                else:
+                    self._months.move_to_end(key)
+                result = part if result is None else result.then(part)
+            return result
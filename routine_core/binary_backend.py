@@ -0,0 +1,158 @@
+import json
+import mmap
+import os
+import struct
+from datetime import date
+
+from .instrument import span
+from .model import FREQUENCIES, Routine, format_time
+from .storage import JournalBackend, empty_data
+
+MAGIC = b"RTB1"
+
+# 파일 머리: 매직, 형식 버전, 레코드 수, 문자열 풀 위치, 추가 필드(JSON) 위치
+HEADER = struct.Struct("<4sHxxIQQ")
+VERSION = 1
+
+# 고정 폭 레코드 (24바이트): id 위치, content 위치, content 길이, id 길이, 분, 빈도, 플래그, 시작일 서수
+RECORD = struct.Struct("<IIIHHBB2xi")
+
+# 고정 폭으로 표현할 수 없는 값은 이 값을 넣고 실제 값은 추가 필드에 둠
+NO_MINUTES = 0xFFFF
+NO_FREQUENCY = 0xFF
+NO_DATE = 0
+
+HAS_CONTENT = 1
+
+
+def _ordinal(value):
+    try:
+        day = date.fromisoformat(value)
+    except (TypeError, ValueError):
+        return NO_DATE
+    return day.toordinal() if day.isoformat() == value else NO_DATE
+
+
+# 데이터 전체를 바이너리 형식으로 변환
+def encode(data):
+    pool = bytearray()
+    interned = {}
+    records = []
+    extras = {}
+
+    def intern(raw):
+        offset = interned.get(raw)
+        if offset is None:
+            offset = interned[raw] = len(pool)
+            pool.extend(raw)
+        return offset
+
+    for row, routine in enumerate(data["routines"]):
+        raw_id = routine.id.encode('utf-8')
+        minutes = routine.minutes
+        if minutes is None or format_time(minutes) != routine.time:
+            minutes = NO_MINUTES
+        code = NO_FREQUENCY if routine.freq is None else int(routine.freq)
+        start = _ordinal(routine.start_date)
+
+        flags = 0
+        content_offset = content_length = 0
+        # 아직 디코딩하지 않은 content는 바이트 그대로 옮김
+        raw = routine.raw_content()
+        if raw is None and isinstance(routine.content, str):
+            raw = routine.content.encode('utf-8')
+        if raw is not None:
+            flags |= HAS_CONTENT
+            content_offset, content_length = intern(raw), len(raw)
+
+        extra = dict(routine.extra or ())
+        if routine.dates is not None:
+            extra["dates"] = routine.dates
+        if routine.completed is not None:
+            extra["completed"] = routine.completed
+        if routine.exdates:
+            extra["exdates"] = routine.exdates
+        if routine.overrides:
+            extra["overrides"] = routine.overrides
+        if minutes == NO_MINUTES and routine.time is not None:
+            extra["time"] = routine.time
+        if code == NO_FREQUENCY and routine.frequency is not None:
+            extra["frequency"] = routine.frequency
+        if start == NO_DATE and routine.start_date is not None:
+            extra["start_date"] = routine.start_date
+        if not flags & HAS_CONTENT and routine.content is not None:
+            extra["content"] = routine.content
+        if extra:
+            extras[str(row)] = extra
+        records.append(RECORD.pack(intern(raw_id), content_offset, content_length, len(raw_id),
+                                   minutes, code, flags, start))
+
+    meta = {key: value for key, value in data.items() if key != "routines"}
+    tail = json.dumps({"meta": meta, "fields": extras}, ensure_ascii=False, separators=(",", ":")).encode('utf-8')
+    pool_offset = HEADER.size + RECORD.size * len(records)
+    header = HEADER.pack(MAGIC, VERSION, len(records), pool_offset, pool_offset + len(pool))
+    return b"".join([header, *records, pool, tail])
+
+
+# mmap으로 읽어서 루틴 목록을 만듦 (content는 Routine.content를 처음 읽을 때 디코딩)
+# 문자열 풀은 bytes로 한 번 복사해 두고 파일은 바로 닫음
+# (Windows는 매핑이 열려 있는 파일을 os.replace로 바꿀 수 없음)
+def decode(buffer):
+    magic, version, count, pool_offset, extra_offset = HEADER.unpack_from(buffer)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("루틴 바이너리 파일 형식이 아닙니다.")
+    pool = bytes(buffer[pool_offset:extra_offset])
+    tail = json.loads(bytes(buffer[extra_offset:]).decode('utf-8'))
+    extras = tail["fields"]
+    table = memoryview(buffer)[HEADER.size:pool_offset]
+    # 시간/날짜 문자열은 종류가 적으므로 한 번만 만들어서 같은 객체를 공유
+    times = {}
+    dates = {}
+    routines = []
+    try:
+        for row, (id_offset, content_offset, content_length, id_length, minutes, code, flags, start) \
+                in enumerate(RECORD.iter_unpack(table)):
+            routine = Routine(id=pool[id_offset:id_offset + id_length].decode('utf-8'))
+            if minutes != NO_MINUTES:
+                time = times.get(minutes)
+                if time is None:
+                    time = times[minutes] = format_time(minutes)
+                routine.time = time
+            if code != NO_FREQUENCY:
+                routine.frequency = FREQUENCIES[code]
+            if start != NO_DATE:
+                day = dates.get(start)
+                if day is None:
+                    day = dates[start] = date.fromordinal(start).isoformat()
+                routine.start_date = day
+            if flags & HAS_CONTENT:
+                routine.defer_content(pool, content_offset, content_length)
+            extra = extras.get(str(row))
+            if extra:
+                routine.update(extra)
+            routines.append(routine)
+    finally:
+        table.release()
+    return dict(tail["meta"], routines=routines)
+
+
+# 바이너리 스냅샷(.rtb) + JSON Lines 저널 방식
+# - 스냅샷: 고정 폭 레코드 테이블(시간, 빈도, 시작일) + content/id 문자열 풀 + 나머지 필드 JSON
+# - 변경 기록은 JournalBackend와 같은 저널에 한 줄씩 추가
+class BinaryBackend(JournalBackend):
+    def _read_snapshot(self):
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            return empty_data()
+        with span("storage.parse"), open(self.path, 'rb') as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            data = decode(mm)
+        data.setdefault("routines", [])
+        return data
+
+    def _write_snapshot(self, data):
+        tmp_path = f"{self.path}.tmp"
+        with span("storage.write"), open(tmp_path, 'wb') as f:
+            f.write(encode(data))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,133 @@
+from datetime import date
+
+from .model import DAILY, MONTHLY, ONCE, WEEKLY
+
+# 완료 기록은 루틴마다 정수 하나(비트셋)로 저장
+# - i번째 비트 = start_date로부터 i일째 되는 날의 완료 여부
+# - data.json에는 16진수 문자열로 루틴의 "completed" 필드에 들어감 (Routine.completed)
+
+
+def _ordinal(day):
+    return date.fromisoformat(day).toordinal() if isinstance(day, str) else day.toordinal()
+
+
+def get_bits(routine):
+    return int(routine.completed or "0", 16)
+
+
+def _start(routine):
+    if routine.start is None:
+        raise ValueError(f"시작일 형식이 올바르지 않습니다: {routine.start_date}")
+    return routine.start
+
+
+def day_offset(routine, day):
+    offset = _ordinal(day) - _start(routine)
+    if offset < 0:
+        raise ValueError(f"시작일 이전 날짜입니다: {day}")
+    return offset
+
+
+def is_completed(routine, day):
+    try:
+        offset = day_offset(routine, day)
+    except ValueError:
+        return False
+    return bool(get_bits(routine) >> offset & 1)
+
+
+# 날짜별 목록의 항목(routine)이 day에 완료됐는지
+# 바꾸거나 옮긴 발생은 시리즈의 복사본이라 완료 기록이 최신이 아닐 수 있으므로 시리즈에서 읽음
+# source: get(id)로 시리즈를 돌려주는 저장소 (RoutineStore, SqliteBackend)
+def occurrence_completed(source, routine, day):
+    if routine.exceptions is not None:
+        routine = source.get(routine.id) or routine
+    return is_completed(routine, day)
+
+
+# 완료 여부를 비트 하나로 반영
+def set_completed(routine, day, done):
+    bit = 1 << day_offset(routine, day)
+    bits = get_bits(routine)
+    bits = bits | bit if done else bits & ~bit
+    routine.completed = format(bits, "x") if bits else None
+
+
+def _range_mask(lo, hi):
+    # lo <= 비트 위치 < hi 인 비트만 1
+    if hi <= lo:
+        return 0
+    return ((1 << (hi - lo)) - 1) << lo
+
+
+# 시작일부터 length일 동안 루틴이 예정된 날을 비트로 표시
+# 반복 예외가 있으면 건너뛰거나 옮겨 간 날은 빼고 옮겨 온 날은 넣음
+def schedule_mask(routine, length):
+    if length <= 0:
+        return 0
+    mask = _rule_mask(routine, length)
+    if routine.exceptions is not None:
+        skip, moved = routine.exceptions
+        base = _start(routine)
+        for day in skip:
+            offset = _ordinal(day) - base
+            if 0 <= offset < length:
+                mask &= ~(1 << offset)
+        for day in moved:
+            offset = _ordinal(day) - base
+            if 0 <= offset < length:
+                mask |= 1 << offset
+    return mask
+
+
+def _rule_mask(routine, length):
+    freq = routine.freq
+    if freq == DAILY:
+        return (1 << length) - 1
+    if freq == WEEKLY:
+        pattern = "0000001" * ((length + 6) // 7)
+        return int(pattern[-length:], 2)
+    start = date.fromordinal(_start(routine))
+    mask = 0
+    if freq == MONTHLY:
+        year, month = start.year, start.month
+        while True:
+            try:
+                offset = date(year, month, start.day).toordinal() - start.toordinal()
+            except ValueError:
+                # 해당 일이 없는 달 (예: 31일)
+                offset = -1
+            if offset >= length:
+                break
+            if offset >= 0:
+                mask |= 1 << offset
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    elif freq == ONCE:
+        for day in routine.dates or ():
+            offset = _ordinal(day) - start.toordinal()
+            if 0 <= offset < length:
+                mask |= 1 << offset
+    return mask
+
+
+# start~end(포함) 기간 중 예정된 날 대비 완료한 비율 (예정된 날이 없으면 None)
+def completion_rate(routine, start, end):
+    base = _start(routine)
+    lo = max(_ordinal(start) - base, 0)
+    hi = _ordinal(end) - base + 1
+    scheduled = schedule_mask(routine, hi) & _range_mask(lo, hi)
+    total = bin(scheduled).count("1")
+    if not total:
+        return None
+    done = bin(get_bits(routine) & scheduled).count("1")
+    return done / total
+
+
+# end(포함)까지 마지막으로 빠뜨린 날 이후 연속으로 완료한 예정일 수
+def current_streak(routine, end):
+    hi = _ordinal(end) - _start(routine) + 1
+    if hi <= 0:
+        return 0
+    scheduled = schedule_mask(routine, hi)
+    missed = scheduled & ~get_bits(routine)
+    return bin(scheduled >> missed.bit_length()).count("1")
@@ -0,0 +1,76 @@
+from collections import OrderedDict
+from datetime import date, timedelta
+
+from .recurrence import matches
+
+# 기본 캐시 크기 (날짜 수)
+DEFAULT_SIZE = 128
+
+
+# 날짜별 루틴 목록(시간 순 정렬)을 기억해 두는 LRU 캐시
+# - 항목은 만들 때의 저장소 version을 함께 들고 있고, version이 다르면 다시 계산
+# - 루틴이 바뀌면 그 루틴이 원래 들어 있던 날짜와 새로 해당하는 날짜만 버리고
+#   나머지 항목은 새 version으로 올려서 계속 사용
+# - 파일을 다시 읽으면 전부 버림 (조회할 때마다 먼저 다른 프로세스의 변경을 확인)
+class DateCache:
+    def __init__(self, store, maxsize=DEFAULT_SIZE):
+        self.store = store
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        store.subscribe(self._on_store_change)
+
+    def close(self):
+        self.store.unsubscribe(self._on_store_change)
+
+    def get(self, day):
+        # 다른 프로세스가 파일을 바꿨으면 저장소가 다시 읽고 version이 바뀜
+        self.store.check_external_changes()
+        entry = self._entries.get(day)
+        if entry is not None and entry[0] == self.store.version:
+            self._entries.move_to_end(day)
+            self.hits += 1
+            return entry[2]
+        self.misses += 1
+        return self._fill(day)
+
+    def _fill(self, day):
+        routines = self.store.routines_on(day)
+        self._entries[day] = (self.store.version, frozenset(r.id for r in routines), routines)
+        self._entries.move_to_end(day)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return routines
+
+    # 아직 캐시에 없는 날짜들을 미리 계산
+    def prefetch(self, days):
+        self.store.check_external_changes()
+        for day in days:
+            entry = self._entries.get(day)
+            if entry is None or entry[0] != self.store.version:
+                self._fill(day)
+
+    def _on_store_change(self, op):
+        if op is None:
+            self._entries.clear()
+            return
+        version = self.store.version
+        if op["op"] == "complete":
+            # 완료 표시는 목록 구성에 영향이 없음
+            affected = lambda day, ids: False
+        else:
+            routine_id = op["routine"].id if op["op"] == "add" else op["id"]
+            routine = self.store.get(routine_id)
+            affected = lambda day, ids: routine_id in ids or (routine is not None and matches(routine, day))
+        for day, (_, ids, routines) in list(self._entries.items()):
+            if affected(day, ids):
+                del self._entries[day]
+            else:
+                self._entries[day] = (version, ids, routines)
+
+
+# 선택한 날짜 주변(앞뒤 하루, 앞뒤 한 주)
+def neighbours(day):
+    current = date.fromisoformat(day)
+    return [(current + timedelta(days=offset)).isoformat() for offset in (1, -1, 7, -7)]
@@ -0,0 +1,403 @@
+import json
+from collections import Counter
+from datetime import datetime, timezone
+from itertools import islice
+
+from .model import DAILY, MONTHLY, ONCE, WEEKLY, Routine, format_time, parse_date
+
+# iCalendar(RFC 5545) 가져오기/내보내기
+# - 내보내기: daily/weekly/monthly는 RRULE 하나짜리 VEVENT, once는 VEVENT 하나(날짜가 여러 개면 RDATE)
+#   건너뛴 발생은 EXDATE, 바꾼 발생은 같은 UID에 RECURRENCE-ID를 단 VEVENT
+# - 가져오기: 파일을 한 줄씩 읽는 제너레이터로 VEVENT를 하나씩 꺼내고, BATCH_SIZE개씩 묶어서 저장
+#   파일 전체를 메모리에 올리지 않음 (원래 일정 바로 뒤에 오지 않은 바꾼 발생은 임시 데이터베이스에 적어 둠)
+# - 시간은 현지 시각(floating)으로 씀, 가져올 때 UTC(Z)나 TZID가 있으면 현지 시각으로 바꿈
+
+PRODID = "-//routine_manager//routine_core.ics//KO"
+
+# 가져올 때 한 번에 저장하는 VEVENT 수
+BATCH_SIZE = 1000
+
+# 한 줄의 최대 길이 (바이트, 줄바꿈 제외)
+LINE_LIMIT = 75
+
+_RRULE_FREQ = {DAILY: "DAILY", WEEKLY: "WEEKLY", MONTHLY: "MONTHLY"}
+_FREQ_NAMES = {"DAILY": "daily", "WEEKLY": "weekly", "MONTHLY": "monthly"}
+_WEEKDAYS = ("MO", "TU", "WE", "TH", "FR", "SA", "SU")
+
+
+def escape_text(value):
+    return (value.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+            .replace("\r\n", "\\n").replace("\n", "\\n"))
+
+
+def unescape_text(value):
+    out = []
+    chars = iter(value)
+    for char in chars:
+        if char == "\\":
+            char = next(chars, "")
+            out.append("\n" if char in ("n", "N") else char)
+        else:
+            out.append(char)
+    return "".join(out)
+
+
+# 75바이트가 넘는 줄을 여러 줄로 나눔 (UTF-8 문자 중간에서 자르지 않음)
+def fold(line):
+    if len(line.encode('utf-8')) <= LINE_LIMIT:
+        return line
+    parts = []
+    current = []
+    size = 0
+    for char in line:
+        width = len(char.encode('utf-8'))
+        # 이어지는 줄은 맨 앞 공백 한 칸을 포함해서 75바이트
+        if size + width > LINE_LIMIT - (1 if parts else 0):
+            parts.append("".join(current))
+            current, size = [], 0
+        current.append(char)
+        size += width
+    parts.append("".join(current))
+    return "\r\n ".join(parts)
+
+
+def _stamp(day, minutes):
+    return f"{day.replace('-', '')}T{format_time(minutes).replace(':', '')}00"
+
+
+# 루틴 하나를 VEVENT 줄들로 (시간이나 날짜가 틀려서 나타낼 수 없으면 아무것도 내보내지 않음)
+def routine_lines(routine, dtstamp):
+    minutes = routine.minutes
+    if minutes is None or routine.freq is None:
+        return
+    if routine.freq == ONCE:
+        dates = sorted(day for day in routine.dates or () if parse_date(day) is not None)
+        if not dates:
+            return
+        first, rdates = dates[0], dates[1:]
+    else:
+        if routine.start is None:
+            return
+        first, rdates = routine.start_date, ()
+    yield "BEGIN:VEVENT"
+    yield f"UID:{routine.id}"
+    yield f"DTSTAMP:{dtstamp}"
+    yield f"DTSTART:{_stamp(first, minutes)}"
+    if routine.freq != ONCE:
+        yield f"RRULE:FREQ={_RRULE_FREQ[routine.freq]}"
+    if rdates:
+        yield "RDATE:" + ",".join(_stamp(day, minutes) for day in rdates)
+    if routine.exdates:
+        yield "EXDATE:" + ",".join(_stamp(day, minutes) for day in routine.exdates)
+    yield f"SUMMARY:{escape_text(routine.content or '')}"
+    if routine.completed:
+        # 완료 기록은 시작일 기준 비트셋이므로 시작일을 함께 씀
+        yield f"X-ROUTINE-COMPLETED;X-START={routine.start_date}:{routine.completed}"
+    yield "END:VEVENT"
+    for origin, fields in (routine.overrides or {}).items():
+        occurrence = routine.on(origin)
+        if occurrence.minutes is None:
+            continue
+        yield "BEGIN:VEVENT"
+        yield f"UID:{routine.id}"
+        yield f"DTSTAMP:{dtstamp}"
+        yield f"RECURRENCE-ID:{_stamp(origin, minutes)}"
+        yield f"DTSTART:{_stamp(fields.get('date', origin), occurrence.minutes)}"
+        yield f"SUMMARY:{escape_text(occurrence.content or '')}"
+        yield "END:VEVENT"
+
+
+# 루틴 목록 전체를 VCALENDAR 줄들로 (줄바꿈/접기 전)
+def iter_ics(routines, now=None):
+    dtstamp = (now or datetime.now(timezone.utc)).strftime("%Y%m%dT%H%M%SZ")
+    yield "BEGIN:VCALENDAR"
+    yield "VERSION:2.0"
+    yield f"PRODID:{PRODID}"
+    yield "CALSCALE:GREGORIAN"
+    for routine in routines:
+        yield from routine_lines(routine, dtstamp)
+    yield "END:VCALENDAR"
+
+
+# out(텍스트 파일, newline='')에 한 줄씩 씀, 내보낸 VEVENT 수를 돌려줌
+def write_ics(routines, out, now=None):
+    events = 0
+    for line in iter_ics(routines, now):
+        if line == "BEGIN:VEVENT":
+            events += 1
+        out.write(fold(line) + "\r\n")
+    return events
+
+
+# 접힌 줄을 이어 붙여서 한 줄(content line)씩 내보냄
+def unfold(lines):
+    pending = None
+    for raw in lines:
+        raw = raw.rstrip("\r\n")
+        if raw[:1] in (" ", "\t"):
+            if pending is not None:
+                pending += raw[1:]
+            continue
+        if pending:
+            yield pending
+        pending = raw
+    if pending:
+        yield pending
+
+
+# "NAME;PARAM=값:VALUE" -> (NAME, {PARAM: 값}, VALUE) (따옴표 안의 : ; 는 구분자가 아님)
+def split_property(line):
+    if '"' not in line:
+        # 대부분의 줄: 따옴표가 없으면 첫 : 에서 나눔
+        head, sep, value = line.partition(":")
+        if not sep:
+            raise ValueError(f"iCalendar 줄 형식이 올바르지 않습니다: {line[:40]}")
+        fields = head.split(";")
+        start = len(head) + 1
+    else:
+        fields, start = _split_quoted(line)
+    params = {}
+    for param in fields[1:]:
+        key, _, value = param.partition("=")
+        params[key.upper()] = value.strip('"')
+    return fields[0].upper(), params, line[start:]
+
+
+def _split_quoted(line):
+    quoted = False
+    fields = []
+    start = 0
+    for pos, char in enumerate(line):
+        if char == '"':
+            quoted = not quoted
+        elif not quoted and char in ";:":
+            fields.append(line[start:pos])
+            start = pos + 1
+            if char == ":":
+                break
+    else:
+        raise ValueError(f"iCalendar 줄 형식이 올바르지 않습니다: {line[:40]}")
+    return fields, start
+
+
+# VEVENT를 하나씩 {속성 이름: [(매개변수, 값), ...]}로 내보냄 (VALARM 같은 하위 구성 요소는 무시)
+def iter_events(lines):
+    event = None
+    nested = 0
+    for line in unfold(lines):
+        try:
+            name, params, value = split_property(line)
+        except ValueError:
+            # 형식이 틀린 줄은 건너뜀
+            continue
+        if name == "BEGIN":
+            if event is None and value.upper() == "VEVENT":
+                event = {}
+            elif event is not None:
+                nested += 1
+        elif name == "END":
+            if nested:
+                nested -= 1
+            elif event is not None and value.upper() == "VEVENT":
+                yield event
+                event = None
+        elif event is not None and not nested:
+            event.setdefault(name, []).append((params, value))
+
+
+# DATE 또는 DATE-TIME 값 -> 현지 시각 datetime (DATE는 그날 0시)
+# convert가 False면 시간대를 바꾸지 않고 적힌 시각 그대로
+def parse_datetime(value, params=None, convert=True):
+    params = params or {}
+    value = value.strip()
+    try:
+        if params.get("VALUE", "").upper() == "DATE" or len(value) == 8:
+            return datetime(int(value[:4]), int(value[4:6]), int(value[6:8]))
+        if len(value.rstrip("Z")) != 15 or value[8] != "T":
+            raise ValueError(value)
+        moment = datetime(int(value[:4]), int(value[4:6]), int(value[6:8]),
+                          int(value[9:11]), int(value[11:13]), int(value[13:15]))
+    except ValueError:
+        raise ValueError("날짜/시간 형식 오류")
+    if not convert:
+        return moment
+    utc = value.endswith("Z")
+    if utc:
+        return moment.replace(tzinfo=timezone.utc).astimezone().replace(tzinfo=None)
+    if "TZID" in params:
+        try:
+            from zoneinfo import ZoneInfo
+
+            zone = ZoneInfo(params["TZID"])
+        except Exception:
+            # 모르는 시간대 이름이면 적힌 시각을 그대로 씀
+            return moment
+        return moment.replace(tzinfo=zone).astimezone().replace(tzinfo=None)
+    return moment
+
+
+def _first(event, name):
+    values = event.get(name)
+    return values[0] if values else None
+
+
+def _datetimes(event, name):
+    return [parse_datetime(item, params)
+            for params, value in event.get(name, ()) for item in value.split(",") if item]
+
+
+def _parse_rrule(value, start):
+    rule = dict(part.split("=", 1) for part in value.upper().split(";") if "=" in part)
+    frequency = _FREQ_NAMES.get(rule.pop("FREQ", ""))
+    if frequency is None:
+        raise ValueError("지원하지 않는 반복 주기")
+    rule.pop("WKST", None)
+    if rule.pop("INTERVAL", "1") != "1":
+        raise ValueError("지원하지 않는 반복 간격")
+    if "COUNT" in rule or "UNTIL" in rule:
+        raise ValueError("끝이 있는 반복")
+    # 시작일과 같은 요일/일이면 규칙이 바뀌지 않음 (많은 프로그램이 이렇게 씀)
+    if frequency == "weekly" and rule.get("BYDAY", _WEEKDAYS[start.weekday()]) == _WEEKDAYS[start.weekday()]:
+        rule.pop("BYDAY", None)
+    if frequency == "monthly" and rule.get("BYMONTHDAY", str(start.day)) == str(start.day):
+        rule.pop("BYMONTHDAY", None)
+    if rule:
+        raise ValueError("지원하지 않는 반복 규칙")
+    return frequency
+
+
+# VEVENT 하나 -> Routine (나타낼 수 없으면 ValueError, 메시지는 건너뛴 이유)
+# UID는 루틴 id로 씀
+def event_to_routine(event):
+    dtstart = _first(event, "DTSTART")
+    if dtstart is None:
+        raise ValueError("DTSTART 없음")
+    start = parse_datetime(dtstart[1], dtstart[0])
+    summary = _first(event, "SUMMARY")
+    content = unescape_text(summary[1]) if summary else ""
+    rrule = _first(event, "RRULE")
+    exdates = sorted({moment.date().isoformat() for moment in _datetimes(event, "EXDATE")})
+    uid = _first(event, "UID")
+    routine = Routine(time=format_time(start.hour * 60 + start.minute), content=content,
+                      id=uid[1] if uid and uid[1] else None)
+    if rrule is None:
+        dates = {start.date().isoformat()}
+        dates.update(moment.date().isoformat() for moment in _datetimes(event, "RDATE"))
+        dates.difference_update(exdates)
+        if not dates:
+            raise ValueError("남은 날짜 없음")
+        routine.frequency = "once"
+        routine.dates = sorted(dates)
+        routine.start_date = routine.dates[0]
+    else:
+        if "RDATE" in event:
+            raise ValueError("지원하지 않는 반복 규칙")
+        # BYDAY/BYMONTHDAY는 원래 시간대 기준이므로 바꾸기 전 시각과 비교
+        routine.frequency = _parse_rrule(rrule[1], parse_datetime(dtstart[1], dtstart[0], convert=False))
+        routine.start_date = start.date().isoformat()
+        routine.exdates = exdates
+    completed = _first(event, "X-ROUTINE-COMPLETED")
+    if completed and completed[1]:
+        start_date = completed[0].get("X-START")
+        if routine.freq == ONCE and parse_date(start_date) is not None:
+            routine.start_date = start_date
+        if start_date == routine.start_date:
+            routine.completed = completed[1]
+    return routine
+
+
+# RECURRENCE-ID가 있는 VEVENT를 store의 해당 루틴 발생 하나에 반영
+def _apply_override(store, routine_id, event):
+    origin = _first(event, "RECURRENCE-ID")
+    day = parse_datetime(origin[1], origin[0]).date().isoformat()
+    status = _first(event, "STATUS")
+    if status and status[1].upper() == "CANCELLED":
+        store.skip_occurrence(routine_id, day)
+        return
+    changes = {}
+    dtstart = _first(event, "DTSTART")
+    if dtstart is not None:
+        moment = parse_datetime(dtstart[1], dtstart[0])
+        changes["date"] = moment.date().isoformat()
+        changes["time"] = format_time(moment.hour * 60 + moment.minute)
+    summary = _first(event, "SUMMARY")
+    if summary is not None:
+        changes["content"] = unescape_text(summary[1])
+    store.override_occurrence(routine_id, day, **changes)
+
+
+def _override(store, routine_id, event, skipped):
+    if routine_id is None or store.get(routine_id) is None:
+        skipped["원래 일정 없음"] += 1
+        return
+    try:
+        _apply_override(store, routine_id, event)
+    except ValueError as e:
+        skipped[str(e)] += 1
+
+
+# lines(파일 객체 등 줄 단위 반복자)의 VEVENT를 store에 추가
+# batch_size개마다 store.batch()로 한 번에 저장, (추가한 루틴 수, {건너뛴 이유: 개수})를 돌려줌
+# UID가 이미 있는 id와 겹치면 새 id를 받음
+# 바꾼 발생(RECURRENCE-ID)은 이번에 가져온 일정에만 반영
+# - 보통 원래 일정 바로 뒤에 오므로 그때는 바로 반영
+# - 그렇지 않은 것은 임시 데이터베이스(디스크)에 적어 뒀다가 모든 일정을 추가한 뒤 반영
+#   가져온 일정의 UID -> 루틴 id도 같은 곳에 적어 두므로 메모리에 쌓이지 않음
+def import_ics(store, lines, batch_size=BATCH_SIZE):
+    # 가져오기에서만 쓰므로 이때 불러옴
+    import sqlite3
+
+    added = 0
+    skipped = Counter()
+    # 마지막으로 추가한 일정의 (UID, 루틴 id)
+    last = None
+    # 파일 이름이 빈 문자열이면 닫을 때 지워지는 임시 데이터베이스
+    spool = sqlite3.connect("")
+    try:
+        spool.execute("CREATE TABLE series (uid TEXT PRIMARY KEY, id TEXT NOT NULL)")
+        spool.execute("CREATE TABLE deferred (uid TEXT NOT NULL, event TEXT NOT NULL)")
+        events = iter_events(lines)
+        while True:
+            chunk = list(islice(events, batch_size))
+            if not chunk:
+                break
+            with store.batch():
+                for event in chunk:
+                    if "RECURRENCE-ID" in event:
+                        uid = _first(event, "UID")
+                        uid = uid[1] if uid else None
+                        if not uid:
+                            skipped["원래 일정 없음"] += 1
+                        elif last is not None and uid == last[0]:
+                            _override(store, last[1], event, skipped)
+                        else:
+                            spool.execute("INSERT INTO deferred VALUES (?, ?)",
+                                          (uid, json.dumps(event, ensure_ascii=False)))
+                        continue
+                    try:
+                        routine = event_to_routine(event)
+                    except ValueError as e:
+                        skipped[str(e)] += 1
+                        continue
+                    uid = routine.id
+                    if uid is not None and store.get(uid) is not None:
+                        routine.id = None
+                    store.add_routine(routine)
+                    added += 1
+                    last = None
+                    if uid is not None:
+                        # 같은 UID가 여러 번 나오면 마지막 일정이 원래 일정
+                        spool.execute("INSERT OR REPLACE INTO series VALUES (?, ?)", (uid, routine.id))
+                        last = (uid, routine.id)
+        rows = spool.execute("SELECT series.id, deferred.event FROM deferred "
+                             "LEFT JOIN series USING (uid) ORDER BY deferred.rowid")
+        while True:
+            chunk = rows.fetchmany(batch_size)
+            if not chunk:
+                break
+            with store.batch():
+                for routine_id, event in chunk:
+                    _override(store, routine_id, json.loads(event), skipped)
+    finally:
+        spool.close()
+    return added, skipped
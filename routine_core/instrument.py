@@ -0,0 +1,159 @@
+import atexit
+import io
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+# 시작할 때 프로파일을 켜는 환경 변수 (cpu, mem 또는 둘 다: "cpu,mem", "1"/"all"은 전부)
+PROFILE_ENV = "ROUTINE_PROFILE"
+
+# CPU 프로파일 저장 경로 (python -m pstats routine_profile.prof 로 확인)
+PROFILE_FILE = "routine_profile.prof"
+
+
+# 구간 하나의 누적 시간 (초)
+class SpanStats:
+    __slots__ = ("count", "total", "last", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.last = 0.0
+        self.max = 0.0
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.last = seconds
+        if seconds > self.max:
+            self.max = seconds
+
+
+_lock = threading.Lock()
+_spans = {}
+_counters = {}
+_profiler = None
+
+
+# 구간 시간 측정: with span("store.load"): ...
+@contextmanager
+def span(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - start)
+
+
+def record(name, seconds):
+    with _lock:
+        stats = _spans.get(name)
+        if stats is None:
+            stats = _spans[name] = SpanStats()
+        stats.add(seconds)
+
+
+def count(name, n=1):
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+
+
+# 지금까지의 측정값 복사본: ({이름: {count, total, last, max}}, {이름: 횟수})
+def snapshot():
+    with _lock:
+        spans = {name: {"count": s.count, "total": s.total, "last": s.last, "max": s.max}
+                 for name, s in _spans.items()}
+        return spans, dict(_counters)
+
+
+def reset():
+    with _lock:
+        _spans.clear()
+        _counters.clear()
+
+
+def profiling():
+    return _profiler is not None
+
+
+def start_profile():
+    global _profiler
+    import cProfile
+
+    if _profiler is None:
+        _profiler = cProfile.Profile()
+        _profiler.enable()
+
+
+# 프로파일을 멈추고 파일로 저장, 누적 시간 상위 limit개 함수를 문자열로 돌려줌
+def stop_profile(path=PROFILE_FILE, limit=20):
+    global _profiler
+    import pstats
+
+    if _profiler is None:
+        return ""
+    profiler, _profiler = _profiler, None
+    profiler.disable()
+    profiler.dump_stats(path)
+    out = io.StringIO()
+    pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(limit)
+    return out.getvalue()
+
+
+def tracing_memory():
+    import tracemalloc
+
+    return tracemalloc.is_tracing()
+
+
+def start_memory():
+    import tracemalloc
+
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+def stop_memory():
+    import tracemalloc
+
+    tracemalloc.stop()
+
+
+# 메모리 사용량 (바이트): tracemalloc을 켰으면 (현재, 최대), 아니면 (None, 프로세스 최대 RSS 또는 None)
+def memory_usage():
+    import tracemalloc
+
+    if tracemalloc.is_tracing():
+        return tracemalloc.get_traced_memory()
+    try:
+        import resource
+    except ImportError:
+        return None, None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux는 KB, macOS는 바이트 단위
+    return None, peak if sys.platform == "darwin" else peak * 1024
+
+
+# tracemalloc 기준 메모리를 많이 잡은 코드 위치 상위 limit개
+def top_allocations(limit=10):
+    import tracemalloc
+
+    if not tracemalloc.is_tracing():
+        return []
+    stats = tracemalloc.take_snapshot().statistics("lineno")
+    return [str(stat) for stat in stats[:limit]]
+
+
+# 환경 변수에 따라 프로파일/메모리 추적을 켜고, 종료할 때 프로파일을 저장
+def configure_from_env(environ=os.environ):
+    value = environ.get(PROFILE_ENV, "").lower()
+    if not value or value == "0":
+        return
+    modes = {"cpu", "mem"} if value in ("1", "all") else set(value.split(","))
+    if "mem" in modes:
+        start_memory()
+    if "cpu" in modes:
+        start_profile()
+        atexit.register(stop_profile)
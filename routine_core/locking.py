@@ -0,0 +1,51 @@
+import os
+import time
+from contextlib import contextmanager
+
+# 잠금을 기다리는 최대 시간 (초)
+LOCK_TIMEOUT = 10.0
+
+if os.name == 'nt':
+    import msvcrt
+
+    def _try_lock(f):
+        f.seek(0)
+        try:
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            return False
+        return True
+
+    def _unlock(f):
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+else:
+    import fcntl
+
+    def _try_lock(f):
+        try:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return False
+        return True
+
+    def _unlock(f):
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+# 여러 프로세스가 같은 데이터 파일을 쓸 때 쓰는 권고 잠금 (<path>.lock 파일)
+# 읽고-확인하고-쓰는 짧은 구간에만 잡아야 함 (같은 프로세스 안에서 중첩하면 안 됨)
+@contextmanager
+def file_lock(path, timeout=LOCK_TIMEOUT):
+    with open(f"{path}.lock", 'a+b') as f:
+        deadline = time.monotonic() + timeout
+        delay = 0.001
+        while not _try_lock(f):
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"잠금을 얻지 못했습니다: {path}")
+            time.sleep(delay)
+            delay = min(delay * 2, 0.05)
+        try:
+            yield
+        finally:
+            _unlock(f)
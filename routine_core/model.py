@@ -0,0 +1,305 @@
+import uuid
+from datetime import date
+from enum import IntEnum
+
+
+# 빈도 (배열 연산/비교용 정수 값)
+class Frequency(IntEnum):
+    ONCE = 0
+    DAILY = 1
+    WEEKLY = 2
+    MONTHLY = 3
+
+
+# 자주 비교하는 곳에서는 Frequency.ONCE 대신 이 이름을 씀 (Enum 클래스 속성 조회가 느림)
+ONCE, DAILY, WEEKLY, MONTHLY = Frequency.ONCE, Frequency.DAILY, Frequency.WEEKLY, Frequency.MONTHLY
+
+FREQUENCIES = [frequency.name.lower() for frequency in Frequency]
+FREQUENCY_CODES = {frequency.name.lower(): frequency for frequency in Frequency}
+
+
+# 형식이 틀린 시간은 하루의 맨 뒤로 정렬
+INVALID_MINUTES = 24 * 60
+
+# 시간/날짜 문자열 변환 결과를 기억해 두는 개수 (종류가 적어서 거의 다 들어감)
+_CACHE_LIMIT = 1 << 16
+_times = {}
+_dates = {}
+
+
+def new_id():
+    return uuid.uuid4().hex
+
+
+# 시간 문자열(HH:MM)을 자정부터의 분으로 변환 (형식이 틀리면 None)
+# strptime("%H:%M")과 같은 입력을 받되 훨씬 빠름 (시/분 한두 자리)
+def parse_time(value):
+    hour, sep, minute = value.partition(":")
+    if not sep or not (0 < len(hour) <= 2 and 0 < len(minute) <= 2):
+        return None
+    if not (hour.isdigit() and minute.isdigit() and hour.isascii() and minute.isascii()):
+        return None
+    hour, minute = int(hour), int(minute)
+    if hour > 23 or minute > 59:
+        return None
+    return hour * 60 + minute
+
+
+def format_time(minutes):
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+# 같은 문자열은 같은 객체 하나를 공유하고 변환 결과도 한 번만 계산: (문자열, 변환 결과)
+def _cached(cache, value, convert):
+    entry = cache.get(value)
+    if entry is None:
+        entry = (value, convert(value))
+        if len(cache) < _CACHE_LIMIT:
+            cache[value] = entry
+    return entry
+
+
+def _minutes(value):
+    return parse_time(value) if isinstance(value, str) else None
+
+
+def _ordinal(value):
+    try:
+        return date.fromisoformat(value).toordinal()
+    except (TypeError, ValueError):
+        return None
+
+
+# "YYYY-MM-DD" 문자열의 날짜 서수 (형식이 틀리면 None)
+def parse_date(value):
+    return (_dates.get(value) or _cached(_dates, value, _ordinal))[1]
+
+
+# 루틴 레코드의 필드 (이 밖의 필드는 extra에 그대로 보관)
+FIELDS = ("id", "time", "content", "frequency", "start_date", "dates", "completed", "exdates", "overrides")
+
+# 발생 하나만 바꿀 때 overrides에 넣을 수 있는 필드 (date는 옮겨 갈 날짜)
+OVERRIDE_FIELDS = ("date", "time", "content")
+_FIELD_SET = frozenset(FIELDS)
+
+
+# 메모리에 올린 루틴 하나
+# - 저장 형식의 필드를 속성으로 가짐 (없는 필드는 None)
+# - time/frequency/start_date를 바꾸면 minutes(자정부터의 분), freq(Frequency), start(날짜 서수)도 함께 바뀜
+#   (형식이 틀렸거나 모르는 값이면 None)
+# - content는 바이너리 파일에서 읽은 경우 처음 읽을 때 디코딩 (binary_backend.py)
+# - 반복 예외 (RRULE의 EXDATE/RECURRENCE-ID와 같은 개념, 없으면 None)
+#   exdates: 건너뛰는 발생 날짜 목록
+#   overrides: {원래 발생 날짜: {"date": 옮긴 날짜, "time": ..., "content": ...}} (바꾼 필드만)
+#   exceptions: 조회용으로 미리 만든 (건너뛸 날짜 집합, {옮겨 온 날짜: 원래 날짜}), 예외가 없으면 None
+# - 변경 기록의 fields처럼 필드 이름으로 다룰 때는 routine["time"], update(...)도 쓸 수 있음
+class Routine:
+    __slots__ = ("id", "_time", "minutes", "_content", "_raw", "_frequency", "freq",
+                 "_start_date", "start", "dates", "completed", "_exdates", "_overrides", "exceptions", "extra")
+
+    def __init__(self, time=None, content=None, frequency=None, start_date=None,
+                 id=None, dates=None, completed=None, extra=None, exdates=None, overrides=None):
+        # 불러올 때 루틴마다 호출되므로 속성 setter를 거치지 않고 직접 채움 (setter와 같은 동작)
+        self.id = id
+        self._time, self.minutes = _times.get(time) or _cached(_times, time, _minutes)
+        self._content = content
+        self._raw = None
+        self._frequency = frequency
+        self.freq = FREQUENCY_CODES.get(frequency)
+        self._start_date, self.start = _dates.get(start_date) or _cached(_dates, start_date, _ordinal)
+        self.dates = dates
+        self.completed = completed
+        self.extra = extra
+        self._exdates = exdates
+        self._overrides = overrides
+        self.exceptions = None
+        if exdates or overrides:
+            self._index_exceptions()
+
+    @classmethod
+    def from_dict(cls, data):
+        extra = None
+        if not data.keys() <= _FIELD_SET:
+            extra = {key: value for key, value in data.items() if key not in _FIELD_SET}
+        get = data.get
+        return cls(get("time"), get("content"), get("frequency"), get("start_date"),
+                   get("id"), get("dates"), get("completed"), extra, get("exdates"), get("overrides"))
+
+    # 저장 형식 (값이 None인 필드는 뺌)
+    def to_dict(self):
+        data = {"id": self.id, "time": self._time, "content": self.content,
+                "frequency": self._frequency, "start_date": self._start_date}
+        if None in data.values():
+            data = {key: value for key, value in data.items() if value is not None}
+        if self.dates is not None:
+            data["dates"] = self.dates
+        if self.completed is not None:
+            data["completed"] = self.completed
+        if self._exdates:
+            data["exdates"] = self._exdates
+        if self._overrides:
+            data["overrides"] = self._overrides
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    @property
+    def time(self):
+        return self._time
+
+    @time.setter
+    def time(self, value):
+        self._time, self.minutes = _times.get(value) or _cached(_times, value, _minutes)
+
+    @property
+    def frequency(self):
+        return self._frequency
+
+    @frequency.setter
+    def frequency(self, value):
+        self._frequency = value
+        self.freq = FREQUENCY_CODES.get(value)
+
+    @property
+    def start_date(self):
+        return self._start_date
+
+    @start_date.setter
+    def start_date(self, value):
+        self._start_date, self.start = _dates.get(value) or _cached(_dates, value, _ordinal)
+
+    @property
+    def exdates(self):
+        return self._exdates
+
+    @exdates.setter
+    def exdates(self, value):
+        self._exdates = value or None
+        self._index_exceptions()
+
+    @property
+    def overrides(self):
+        return self._overrides
+
+    @overrides.setter
+    def overrides(self, value):
+        self._overrides = value or None
+        self._index_exceptions()
+
+    def _index_exceptions(self):
+        if not self._exdates and not self._overrides:
+            self.exceptions = None
+            return
+        skip = set(self._exdates or ())
+        moved = {}
+        for day, fields in (self._overrides or {}).items():
+            skip.add(day)
+            moved[fields.get("date", day)] = day
+        self.exceptions = (frozenset(skip), moved)
+
+    # 얕은 복사본 (content를 아직 디코딩하지 않았으면 그대로 둠)
+    def copy(self):
+        clone = Routine.__new__(Routine)
+        for name in Routine.__slots__:
+            setattr(clone, name, getattr(self, name))
+        if clone.extra is not None:
+            clone.extra = dict(clone.extra)
+        return clone
+
+    # 원래 날짜가 day인 발생 (overrides가 있으면 그 필드를 적용한 복사본, 없으면 자기 자신)
+    def on(self, day):
+        fields = self._overrides.get(day) if self._overrides else None
+        if not fields:
+            return self
+        occurrence = Routine.from_dict(self.to_dict())
+        for key in ("time", "content"):
+            if key in fields:
+                setattr(occurrence, key, fields[key])
+        return occurrence
+
+    @property
+    def content(self):
+        if self._raw is not None:
+            pool, offset, length = self._raw
+            self._content = pool[offset:offset + length].decode('utf-8')
+            self._raw = None
+        return self._content
+
+    @content.setter
+    def content(self, value):
+        self._content = value
+        self._raw = None
+
+    # content를 pool[offset:offset + length]의 UTF-8 바이트로 두고 처음 읽을 때 디코딩
+    def defer_content(self, pool, offset, length):
+        self._content = None
+        self._raw = (pool, offset, length)
+
+    # 아직 디코딩하지 않은 content의 원래 바이트 (없으면 None)
+    def raw_content(self):
+        if self._raw is None:
+            return None
+        pool, offset, length = self._raw
+        return pool[offset:offset + length]
+
+    def __getitem__(self, key):
+        value = getattr(self, key) if key in FIELDS else (self.extra or {}).get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def __setitem__(self, key, value):
+        if key in FIELDS:
+            setattr(self, key, value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def update(self, fields):
+        for key, value in fields.items():
+            self[key] = value
+
+    def __eq__(self, other):
+        if isinstance(other, (Routine, dict)):
+            return self.to_dict() == (other if isinstance(other, dict) else other.to_dict())
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Routine({self.to_dict()!r})"
+
+
+# 정렬용 키 (분)
+def time_key(routine):
+    return INVALID_MINUTES if routine.minutes is None else routine.minutes
+
+
+# 시간 문자열(HH:MM) 형식 검사
+def is_valid_time(value):
+    return parse_time(value) is not None
+
+
+# 새 루틴 레코드 (once 루틴은 dates에 해당 날짜를 넣음)
+def make_routine(time, content, frequency, start_date):
+    if frequency not in FREQUENCIES:
+        raise ValueError(f"알 수 없는 빈도: {frequency}")
+    minutes = parse_time(time)
+    return Routine(
+        time=time if minutes is None else format_time(minutes),
+        content=content,
+        frequency=frequency,
+        start_date=start_date,
+        id=new_id(),
+        dates=[start_date] if frequency == "once" else None,
+    )
@@ -0,0 +1,175 @@
+from datetime import date
+
+import numpy as np
+
+from .model import DAILY, MONTHLY, ONCE, WEEKLY
+
+# 날짜 서수(ordinal)를 1970-01-01 기준 일수로 바꿀 때 빼는 값
+_EPOCH = date(1970, 1, 1).toordinal()
+
+# (일(day) * _GROUP + 기간 내 위치) 형태로 묶어서 정렬할 때 쓰는 간격
+_GROUP = 1 << 24
+
+
+def _day(value):
+    return np.datetime64(value, 'D').astype(np.int64)
+
+
+# 1970-01-01 기준 일수 배열에서 각 날짜의 일(day)을 구함
+def _day_of_month(days):
+    stamps = days.astype('datetime64[D]')
+    return (stamps - stamps.astype('datetime64[M]')).astype(np.int64) + 1
+
+
+# (루틴 번호, 날짜) 쌍을 정수 하나로 합친 키 (반복 예외 비교용)
+def _pair_keys(rows, days):
+    return (rows.astype(np.int64) << 32) | (days & 0xFFFFFFFF)
+
+
+def _days(values):
+    return np.array(values, dtype='datetime64[D]').astype(np.int64)
+
+
+# 루틴 목록을 빈도/시작일 배열로 한 번만 변환해 둔 표
+# 반복 예외가 있는 루틴은 따로 모아 둠
+# - skip_keys: 규칙상 발생하지만 건너뛰거나 옮겨 간 (루틴 번호, 날짜) 키 (정렬됨)
+# - 옮기거나 바꾼 발생은 once처럼 (번호, 날짜) 쌍으로 넣고, 번호는 routines 끝에 붙인 복사본을 가리킴
+# - source: 번호마다 원래 루틴의 번호 (복사본이 아니면 자기 자신), count: 복사본을 뺀 루틴 수
+class RoutineColumns:
+    def __init__(self, routines):
+        self.routines = list(routines)
+        count = len(self.routines)
+        # 빈도를 모르거나 시작일이 틀린 루틴은 -1 (어느 날에도 해당하지 않음)
+        self.frequency = np.array(
+            [-1 if r.freq is None or (r.start is None and r.freq != ONCE) else r.freq for r in self.routines],
+            dtype=np.int8)
+        self.start = np.array(
+            [_EPOCH if r.start is None else r.start for r in self.routines], dtype=np.int64) - _EPOCH
+        self.start_day = _day_of_month(self.start)
+        once_rows = []
+        once_dates = []
+        for row in np.flatnonzero(self.frequency == ONCE):
+            routine = self.routines[row]
+            skip = routine.exceptions[0] if routine.exceptions is not None else ()
+            dates = [day for day in routine.dates or () if day not in skip]
+            once_rows.extend([row] * len(dates))
+            once_dates.extend(dates)
+        skip_rows = []
+        skip_dates = []
+        source = list(range(count))
+        for row in [row for row, r in enumerate(self.routines) if r.exceptions is not None]:
+            routine = self.routines[row]
+            skip, moved = routine.exceptions
+            if routine.freq != ONCE:
+                skip_rows.extend([row] * len(skip))
+                skip_dates.extend(skip)
+            for day, origin in moved.items():
+                once_rows.append(len(self.routines))
+                once_dates.append(day)
+                self.routines.append(routine.on(origin))
+                source.append(row)
+        # 복사본은 규칙으로는 어느 날에도 해당하지 않음
+        extra = len(self.routines) - count
+        self.count = count
+        self.source = np.array(source, dtype=np.int64)
+        self.frequency = np.concatenate([self.frequency, np.full(extra, -1, dtype=np.int8)])
+        self.start = np.concatenate([self.start, np.zeros(extra, dtype=np.int64)])
+        self.start_day = np.concatenate([self.start_day, np.ones(extra, dtype=np.int64)])
+        self.once_rows = np.array(once_rows, dtype=np.int64)
+        self.once_days = _days(once_dates)
+        self.skip_keys = np.sort(_pair_keys(np.array(skip_rows, dtype=np.int64), _days(skip_dates)))
+
+
+# first부터 step 간격으로 count번 반복되는 날짜들을 한 번에 펼침
+def _expand(rows, first, step, count):
+    keep = count > 0
+    rows, first, step, count = rows[keep], first[keep], step[keep], count[keep]
+    total = int(count.sum())
+    offsets = np.arange(total, dtype=np.int64) - np.repeat(np.cumsum(count) - count, count)
+    return np.repeat(rows, count), np.repeat(first, count) + offsets * np.repeat(step, count)
+
+
+# 기간 안의 발생 내역 (날짜/루틴 번호 쌍, 정렬되지 않은 상태)
+class Occurrences:
+    def __init__(self, columns, start, end, days, rows):
+        self.columns = columns
+        self.start = start
+        self.end = end
+        self.days = days
+        self.rows = rows
+
+    def __len__(self):
+        return len(self.days)
+
+    def dates(self):
+        return self.days.astype('datetime64[D]')
+
+    # 날짜별 발생 횟수 (start부터 end까지 하루 단위 배열)
+    def counts(self):
+        return np.bincount(self.days - self.start, minlength=self.end - self.start + 1)
+
+    # 발생이 하나라도 있는 날짜들
+    def busy_dates(self):
+        return (np.flatnonzero(self.counts()) + self.start).astype('datetime64[D]')
+
+    # {"YYYY-MM-DD": [루틴, ...]} (각 날짜 안에서는 저장된 순서)
+    def by_date(self):
+        order = np.lexsort((self.rows, self.days))
+        days = self.days[order]
+        rows = self.rows[order]
+        bounds = np.flatnonzero(np.diff(days)) + 1
+        routines = self.columns.routines
+        result = {}
+        for lo, hi in zip(np.r_[0, bounds], np.r_[bounds, len(days)]):
+            if lo == hi:
+                continue
+            key = str(days[lo].astype('datetime64[D]'))
+            result[key] = [routines[row] for row in rows[lo:hi]]
+        return result
+
+
+# start~end(포함) 기간 동안 모든 루틴의 발생 날짜를 한 번에 계산
+# 규칙은 refresh_routines와 같음: once는 dates에 있는 날, 나머지는 시작일 이후
+# daily는 매일, weekly는 시작일과 7의 배수 차이, monthly는 시작일과 같은 일(day)
+# 반복 예외는 규칙으로 펼친 뒤 skip_keys로 빼고, 옮기거나 바꾼 발생은 once와 같이 더함
+def occurrences(routines, start, end):
+    columns = routines if isinstance(routines, RoutineColumns) else RoutineColumns(routines)
+    first_day, last_day = int(_day(start)), int(_day(end))
+    frequency = columns.frequency
+    parts_rows = []
+    parts_days = []
+
+    # once: dates 중 기간 안에 있는 것
+    in_range = (columns.once_days >= first_day) & (columns.once_days <= last_day)
+    parts_rows.append(columns.once_rows[in_range])
+    parts_days.append(columns.once_days[in_range])
+
+    # daily / weekly: 기간 안의 첫 발생일부터 등간격
+    for code, step in ((DAILY, 1), (WEEKLY, 7)):
+        rows = np.flatnonzero(frequency == code)
+        start_days = columns.start[rows]
+        first = np.where(start_days >= first_day, start_days,
+                         first_day + (start_days - first_day) % step)
+        count = np.where(first <= last_day, (last_day - first) // step + 1, 0)
+        rows, days = _expand(rows, first, np.full(len(rows), step, dtype=np.int64), count)
+        parts_rows.append(rows)
+        parts_days.append(days)
+
+    # monthly: 기간의 날짜들을 (일, 날짜) 순으로 정렬해 두고 루틴마다 구간을 찾음
+    rows = np.flatnonzero(frequency == MONTHLY)
+    if len(rows) and last_day >= first_day:
+        range_days = np.arange(first_day, last_day + 1, dtype=np.int64)
+        keys = np.sort(_day_of_month(range_days) * _GROUP + (range_days - first_day))
+        group = columns.start_day[rows] * _GROUP
+        lo = np.searchsorted(keys, group + np.maximum(columns.start[rows] - first_day, 0))
+        hi = np.searchsorted(keys, group + _GROUP)
+        rows, positions = _expand(rows, lo, np.ones(len(rows), dtype=np.int64), hi - lo)
+        parts_rows.append(rows)
+        parts_days.append(keys[positions] % _GROUP + first_day)
+
+    days = np.concatenate(parts_days)
+    rows = np.concatenate(parts_rows)
+    if len(columns.skip_keys):
+        keep = ~np.isin(_pair_keys(rows, days), columns.skip_keys)
+        days, rows = days[keep], rows[keep]
+    return Occurrences(columns, first_day, last_day, days, rows)
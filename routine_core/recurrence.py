@@ -0,0 +1,246 @@
+from bisect import bisect_left, bisect_right
+from datetime import date
+from heapq import merge
+from operator import itemgetter
+
+from .model import DAILY, ONCE, OVERRIDE_FIELDS, WEEKLY, parse_date, time_key
+
+
+# "YYYY-MM-DD" 문자열을 날짜 서수(ordinal)로 변환
+def date_ordinal(value):
+    ordinal = parse_date(value)
+    if ordinal is None:
+        raise ValueError(f"날짜 형식이 올바르지 않습니다: {value}")
+    return ordinal
+
+
+# 루틴이 해당 날짜에 해당하는지 판단 (refresh_routines의 규칙과 동일)
+# 시작일이 없거나 형식이 틀린 반복 루틴은 어느 날에도 해당하지 않음
+# 반복 예외가 있으면 옮겨 온 날짜는 해당, 건너뛰거나 옮겨 간 날짜는 해당하지 않음 (집합/사전 조회 한 번)
+def matches(routine, day):
+    exceptions = routine.exceptions
+    if exceptions is not None:
+        if day in exceptions[1]:
+            return True
+        if day in exceptions[0]:
+            return False
+    freq = routine.freq
+    if freq == ONCE:
+        return day in (routine.dates or ())
+    start = routine.start
+    if freq is None or start is None:
+        return False
+    current = date_ordinal(day)
+    if current < start:
+        return False
+    if freq == DAILY:
+        return True
+    if freq == WEEKLY:
+        return (current - start) % 7 == 0
+    return date.fromordinal(start).day == date.fromordinal(current).day
+
+
+# 시간 순으로 정렬된 루틴 묶음 (같은 시간이면 저장 순서)
+# 조회할 날짜 이전에 시작한 루틴만 골라서 이미 정렬된 순서대로 내보냄
+class _Bucket:
+    def __init__(self):
+        self.keys = []
+        self.items = []
+
+    # 정렬되지 않은 (minutes, seq, start, routine) 목록으로 한 번에 채움
+    def fill(self, entries):
+        entries.sort(key=itemgetter(0, 1))
+        self.keys = [(minutes, seq) for minutes, seq, _, _ in entries]
+        self.items = [(start, routine) for _, _, start, routine in entries]
+
+    def add(self, minutes, seq, start, routine):
+        pos = bisect_right(self.keys, (minutes, seq))
+        self.keys.insert(pos, (minutes, seq))
+        self.items.insert(pos, (start, routine))
+
+    def remove(self, minutes, seq):
+        pos = bisect_left(self.keys, (minutes, seq))
+        del self.keys[pos]
+        del self.items[pos]
+
+    # skipped: 이 날 건너뛰는 루틴 id 집합 (없으면 None)
+    def started_by(self, ordinal, skipped=None):
+        for key, (start, routine) in zip(self.keys, self.items):
+            if start <= ordinal and not (skipped and routine.id in skipped):
+                yield key, routine
+
+    def __len__(self):
+        return len(self.items)
+
+
+# 빈도별로 미리 나눠 둔 반복 규칙 인덱스
+# - once: 날짜별 묶음
+# - daily: 하나의 묶음
+# - weekly: 시작 요일별 묶음
+# - monthly: 시작 일(day)별 묶음
+# 날짜와 시간(분)은 루틴이 인덱스에 들어올 때 한 번만 변환하고, 묶음마다 시간 순으로 정렬해 둠
+# 날짜 하나를 조회하면 해당하는 묶음 몇 개만 골라 이미 정렬된 목록을 병합(k-way merge)
+# 반복 예외는 드물기 때문에 따로 둠
+# - 건너뛰는 발생: {날짜: 루틴 id 집합} (예외가 없는 날짜는 사전 조회 한 번으로 끝남)
+# - 바꾸거나 옮긴 발생: 바뀐 시간/내용을 적용한 복사본을 옮겨 간 날짜의 once 묶음에 넣음
+class RecurrenceIndex:
+    def __init__(self, routines=()):
+        self.rebuild(routines)
+
+    # 처음 만들 때는 묶음마다 모아서 한 번에 정렬 (하나씩 끼워 넣으면 O(N^2))
+    def rebuild(self, routines):
+        self._seq = 0
+        self._entries = {}
+        self._once = {}
+        self._daily = _Bucket()
+        self._weekly = {}
+        self._monthly = {}
+        self._skipped = {}
+        pending = {}
+        for routine in routines:
+            seq = self._seq
+            self._seq += 1
+            for bucket, entry in self._place(routine, seq):
+                pending.setdefault(id(bucket), (bucket, []))[1].append(entry)
+        for bucket, entries in pending.values():
+            bucket.fill(entries)
+
+    def add(self, routine, seq=None):
+        if seq is None:
+            seq = self._seq
+            self._seq += 1
+        for bucket, entry in self._place(routine, seq):
+            bucket.add(*entry)
+        return seq
+
+    # 루틴이 들어갈 묶음과 항목 목록, _entries에도 기록
+    # _entries: {id: (빈도, once는 날짜 목록/나머지는 시작일, 분, 순번, 건너뛰는 날짜, [(옮겨 간 날짜, 분)])}
+    def _place(self, routine, seq):
+        minutes = time_key(routine)
+        freq = routine.freq
+        exceptions = routine.exceptions
+        skip = exceptions[0] if exceptions is not None else ()
+        if freq == ONCE:
+            key = [day for day in routine.dates or () if day not in skip]
+            placed = [(self._once.setdefault(day, _Bucket()), (minutes, seq, 0, routine)) for day in key]
+            skip = ()
+        else:
+            key = routine.start
+            bucket = self._bucket(freq, key, create=True)
+            placed = [(bucket, (minutes, seq, key, routine))] if bucket is not None else []
+            for day in skip:
+                self._skipped.setdefault(day, set()).add(routine.id)
+        moves = ()
+        if exceptions is not None:
+            moves = []
+            for day, origin in exceptions[1].items():
+                occurrence = routine.on(origin)
+                moves.append((day, time_key(occurrence)))
+                placed.append((self._once.setdefault(day, _Bucket()), (moves[-1][1], seq, 0, occurrence)))
+        self._entries[routine.id] = (freq, key, minutes, seq, skip, moves)
+        return placed
+
+    # 인덱스에서 빼고, 같은 자리에 다시 넣을 수 있도록 순번을 돌려줌
+    def remove(self, routine):
+        entry = self._entries.pop(routine.id, None)
+        if entry is None:
+            return
+        freq, key, minutes, seq, skip, moves = entry
+        for day in skip:
+            ids = self._skipped[day]
+            ids.discard(routine.id)
+            if not ids:
+                del self._skipped[day]
+        once = [(day, minutes) for day in key] if freq == ONCE else []
+        for day, day_minutes in [*once, *moves]:
+            bucket = self._once[day]
+            bucket.remove(day_minutes, seq)
+            if not bucket:
+                del self._once[day]
+        if freq != ONCE:
+            bucket = self._bucket(freq, key)
+            if bucket is not None:
+                bucket.remove(minutes, seq)
+        return seq
+
+    def _bucket(self, freq, start, create=False):
+        if freq is None or start is None:
+            return None
+        if freq == DAILY:
+            return self._daily
+        if freq == WEEKLY:
+            buckets, key = self._weekly, start % 7
+        else:
+            buckets, key = self._monthly, date.fromordinal(start).day
+        if create:
+            return buckets.setdefault(key, _Bucket())
+        return buckets.get(key)
+
+    # 해당 날짜의 루틴 목록 (시간 순, 같은 시간이면 저장 순서)
+    def query(self, day):
+        current = date.fromisoformat(day)
+        ordinal = current.toordinal()
+        skipped = self._skipped.get(day)
+        buckets = [self._daily, self._weekly.get(ordinal % 7), self._monthly.get(current.day)]
+        sources = [bucket.started_by(ordinal, skipped) for bucket in buckets if bucket]
+        once = self._once.get(day)
+        if once:
+            sources.append(once.started_by(ordinal))
+        return [routine for _, routine in merge(*sources, key=itemgetter(0))]
+
+
+# 화면에 보이는 발생 날짜(day)의 원래 발생 날짜 (옮겨 온 발생이면 옮기기 전 날짜)
+# 루틴이 그날 해당하지 않으면 ValueError
+def occurrence_origin(routine, day):
+    if not matches(routine, day):
+        raise ValueError(f"{day}에는 이 루틴이 없습니다.")
+    exceptions = routine.exceptions
+    return exceptions[1].get(day, day) if exceptions is not None else day
+
+
+# 발생 하나를 건너뛸 때 update_routine에 넘길 필드
+def skip_fields(routine, day):
+    origin = occurrence_origin(routine, day)
+    overrides = dict(routine.overrides or {})
+    overrides.pop(origin, None)
+    exdates = sorted(set(routine.exdates or ()) | {origin})
+    return {"exdates": exdates, "overrides": overrides or None}
+
+
+# 발생 하나만 바꿀 때 update_routine에 넘길 필드
+# changes: OVERRIDE_FIELDS 중 바꿀 값 (date를 주면 그 날짜로 옮김)
+def override_fields(routine, day, changes):
+    unknown = set(changes) - set(OVERRIDE_FIELDS)
+    if unknown:
+        raise ValueError(f"발생 하나에는 바꿀 수 없는 필드: {', '.join(sorted(unknown))}")
+    origin = occurrence_origin(routine, day)
+    fields = dict((routine.overrides or {}).get(origin, {}), **changes)
+    target = fields.get("date", origin)
+    if target != origin:
+        ordinal = date_ordinal(target)
+        if routine.start is not None and ordinal < routine.start:
+            raise ValueError(f"시작일 이전으로는 옮길 수 없습니다: {target}")
+        if target != day and matches(routine, target):
+            raise ValueError(f"{target}에는 이미 이 루틴이 있습니다.")
+    else:
+        fields.pop("date", None)
+    # 원래 값과 같은 필드는 남기지 않음
+    for key in ("time", "content"):
+        if key in fields and fields[key] == getattr(routine, key):
+            del fields[key]
+    overrides = dict(routine.overrides or {})
+    if fields:
+        overrides[origin] = fields
+    else:
+        overrides.pop(origin, None)
+    return {"overrides": overrides or None}
+
+
+# 시리즈 전체를 바꿀 때 update_routine에 넘길 필드
+# 반복 규칙(빈도/시작일)이 바뀌면 예전 발생 날짜 기준의 예외는 의미가 없으므로 함께 지움
+def series_fields(routine, changes):
+    fields = dict(changes)
+    rule_changed = any(key in fields and fields[key] != getattr(routine, key) for key in ("frequency", "start_date"))
+    if rule_changed and routine.exceptions is not None:
+        fields.update(exdates=None, overrides=None)
+    return fields
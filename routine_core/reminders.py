@@ -0,0 +1,212 @@
+import heapq
+import itertools
+import time as _time
+from datetime import date, datetime, timedelta
+
+from .model import DAILY, MONTHLY, ONCE, WEEKLY
+
+# Tk 타이머를 한 번에 거는 최대 시간 (절전/시계 변경 대비, 밀리초)
+MAX_TK_DELAY = 10 * 60 * 1000
+
+
+def _at(day, minutes):
+    return datetime(day.year, day.month, day.day) + timedelta(minutes=minutes)
+
+
+# after 이후(같은 시각은 제외) 루틴이 처음으로 돌아오는 시각 (없으면 None)
+# 반복 예외가 있으면 건너뛰거나 옮겨 간 발생은 넘기고, 옮기거나 바꾼 발생은 바뀐 날짜/시간으로 셈
+def next_occurrence(routine, after):
+    if routine.exceptions is None:
+        return _next_by_rule(routine, after)
+    skip, moved = routine.exceptions
+    due = _next_by_rule(routine, after)
+    # 건너뛰는 날짜 수만큼만 더 찾으면 됨
+    while due is not None and due.date().isoformat() in skip:
+        due = _next_by_rule(routine, due)
+    for day, origin in moved.items():
+        minutes = routine.on(origin).minutes
+        if minutes is None:
+            continue
+        candidate = _at(date.fromisoformat(day), minutes)
+        if candidate > after and (due is None or candidate < due):
+            due = candidate
+    return due
+
+
+# due 시각에 울리는 발생 (바꾼 발생이면 바뀐 시간/내용을 적용한 복사본)
+def occurrence_at(routine, due):
+    if routine.exceptions is not None:
+        origin = routine.exceptions[1].get(due.date().isoformat())
+        if origin is not None:
+            return routine.on(origin)
+    return routine
+
+
+def _next_by_rule(routine, after):
+    minutes = routine.minutes
+    freq = routine.freq
+    if minutes is None or freq is None:
+        return None
+    if freq == ONCE:
+        times = [_at(date.fromisoformat(day), minutes) for day in routine.dates or ()]
+        upcoming = [t for t in times if t > after]
+        return min(upcoming) if upcoming else None
+    if routine.start is None:
+        return None
+    start = date.fromordinal(routine.start)
+    day = max(start, after.date())
+    if freq == DAILY:
+        if _at(day, minutes) <= after:
+            day += timedelta(days=1)
+        return _at(day, minutes)
+    if freq == WEEKLY:
+        day += timedelta(days=-(day - start).days % 7)
+        if _at(day, minutes) <= after:
+            day += timedelta(days=7)
+        return _at(day, minutes)
+    if freq == MONTHLY:
+        year, month = day.year, day.month
+        # 해당 일이 없는 달은 건너뜀 (31일이어도 몇 달 안에 반드시 나옴)
+        for _ in range(24):
+            try:
+                candidate = _at(date(year, month, start.day), minutes)
+            except ValueError:
+                candidate = None
+            if candidate is not None and candidate.date() >= start and candidate > after:
+                return candidate
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return None
+
+
+# 루틴 알림 스케줄러
+# - 루틴마다 다음 알림 시각 하나만 최소 힙에 넣어 둠 (추가/갱신/꺼내기 O(log N))
+# - 루틴이 바뀌면 그 루틴 항목만 무효화하고 다시 넣음 (힙 전체를 다시 계산하지 않음)
+# - 알림이 울리면 같은 루틴의 다음 시각을 계산해서 다시 넣음
+# - attach_tk(root)로 Tk mainloop의 after()에 붙이면 다음 알림 시각까지 잠들었다가 깨어남
+class ReminderScheduler:
+    def __init__(self, store, callback, now=datetime.now):
+        self.store = store
+        self.callback = callback
+        self.now = now
+        self._heap = []
+        self._entries = {}
+        self._counter = itertools.count()
+        self._root = None
+        self._after_id = None
+        self._armed_for = None
+        self.rebuild()
+        store.subscribe(self._on_store_change)
+
+    def close(self):
+        self.store.unsubscribe(self._on_store_change)
+        self._cancel_tk()
+
+    def rebuild(self):
+        self._heap = []
+        self._entries = {}
+        after = self.now()
+        for routine in self.store.routines:
+            self._push(routine, after)
+        self._rearm()
+
+    def _push(self, routine, after):
+        due = next_occurrence(routine, after)
+        if due is None:
+            return
+        entry = [due, next(self._counter), routine.id]
+        self._entries[routine.id] = entry
+        heapq.heappush(self._heap, entry)
+
+    def unschedule(self, routine_id):
+        entry = self._entries.pop(routine_id, None)
+        if entry is not None:
+            # 힙에서 바로 빼지 않고 표시만 해 둠 (꺼낼 때 버림)
+            entry[-1] = None
+            # 버려진 항목이 너무 많이 쌓이면 살아 있는 항목만으로 힙을 다시 만듦
+            if len(self._heap) > 2 * len(self._entries) + 64:
+                self._heap = list(self._entries.values())
+                heapq.heapify(self._heap)
+
+    def reschedule(self, routine_id):
+        self.unschedule(routine_id)
+        routine = self.store.get(routine_id)
+        if routine is not None:
+            self._push(routine, self.now())
+        self._rearm()
+
+    def _on_store_change(self, op):
+        if op is None:
+            self.rebuild()
+        elif op["op"] == "add":
+            self.reschedule(op["routine"].id)
+        elif op["op"] in ("update", "delete"):
+            self.reschedule(op["id"])
+
+    def _discard_stale(self):
+        while self._heap and self._heap[0][-1] is None:
+            heapq.heappop(self._heap)
+
+    # 다음 알림 시각 (없으면 None)
+    def next_due(self):
+        self._discard_stale()
+        return self._heap[0][0] if self._heap else None
+
+    # now까지 도래한 알림을 모두 울리고 각 루틴의 다음 시각을 다시 넣음
+    def run_pending(self, now=None):
+        now = now or self.now()
+        fired = []
+        while True:
+            self._discard_stale()
+            if not self._heap or self._heap[0][0] > now:
+                break
+            due, _, routine_id = heapq.heappop(self._heap)
+            del self._entries[routine_id]
+            routine = self.store.get(routine_id)
+            if routine is None:
+                continue
+            self._push(routine, max(due, now))
+            fired.append((occurrence_at(routine, due), due))
+        for routine, due in fired:
+            self.callback(routine, due)
+        return fired
+
+    def attach_tk(self, root):
+        self._root = root
+        self._rearm()
+
+    def _cancel_tk(self):
+        if self._root is not None and self._after_id is not None:
+            self._root.after_cancel(self._after_id)
+        self._after_id = None
+        self._armed_for = None
+
+    # 가장 이른 알림 시각에 맞춰 Tk 타이머를 다시 검
+    def _rearm(self):
+        if self._root is None:
+            return
+        due = self.next_due()
+        if due == self._armed_for and self._after_id is not None:
+            return
+        self._cancel_tk()
+        if due is None:
+            return
+        delay = int((due - self.now()).total_seconds() * 1000)
+        self._armed_for = due
+        self._after_id = self._root.after(max(0, min(delay, MAX_TK_DELAY)), self._on_tk_timer)
+
+    def _on_tk_timer(self):
+        self._after_id = None
+        self._armed_for = None
+        self.run_pending()
+        self._rearm()
+
+    # Tk 없이 쓰는 경우: 다음 알림까지 잠들었다가 울리기를 반복
+    def run_forever(self, sleep=_time.sleep):
+        while True:
+            due = self.next_due()
+            if due is None:
+                return
+            wait = (due - self.now()).total_seconds()
+            if wait > 0:
+                sleep(min(wait, MAX_TK_DELAY / 1000))
+            self.run_pending()
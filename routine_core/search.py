@@ -0,0 +1,233 @@
+import heapq
+import math
+import re
+import unicodedata
+from datetime import datetime
+
+from .instrument import span
+from .reminders import next_occurrence
+
+# 루틴 내용(content) 전문 검색
+# - 역색인: {토큰: 루틴 id 집합}, 토큰은 단어별 글자 2-gram (한 글자 단어는 그 글자)
+#   조사/어미가 붙어도("뉴스를") 부분 문자열로 찾을 수 있도록 형태소 분석 대신 n-gram을 씀
+# - 한글은 초성 2-gram도 함께 색인해서 "ㄴㅅ"로 "뉴스"를 찾을 수 있음
+# - 검색어의 각 단어마다 토큰 집합의 교집합으로 후보를 줄이고, 3글자 이상이면 실제로 포함하는지 확인
+# - 저장소 변경 알림(subscribe)으로 추가/수정/삭제된 루틴만 색인을 고침, 파일을 다시 읽으면 처음 검색할 때 다시 만듦
+
+# 검색 결과 기본 개수
+DEFAULT_LIMIT = 50
+
+_WORD = re.compile(r"\w+")
+
+# 초성 토큰 앞에 붙이는 표시 (일반 글자 토큰과 섞이지 않도록)
+_CHOSUNG_MARK = "\x01"
+
+# NFKC 정규화를 거치면 호환 자모(ㄱ, U+3131)가 첫가끝 초성(ᄀ, U+1100)으로 바뀌므로 초성은 이 범위로 다룸
+_CHOSUNG_FIRST, _CHOSUNG_LAST = 0x1100, 0x1112
+_HANGUL_FIRST, _HANGUL_LAST = 0xAC00, 0xD7A3
+
+
+def normalize(text):
+    return unicodedata.normalize("NFKC", text or "").casefold()
+
+
+def _is_hangul(char):
+    return _HANGUL_FIRST <= ord(char) <= _HANGUL_LAST
+
+
+# 한글 음절 -> 초성 변환표 (str.translate용, 음절마다 계산하는 것보다 훨씬 빠름)
+_CHOSUNG_TABLE = {code: _CHOSUNG_FIRST + (code - _HANGUL_FIRST) // 588
+                  for code in range(_HANGUL_FIRST, _HANGUL_LAST + 1)}
+
+
+# 한글 음절은 초성으로, 나머지 글자는 그대로
+def chosung(text):
+    return text.translate(_CHOSUNG_TABLE)
+
+
+def _is_chosung_query(word):
+    return all(_CHOSUNG_FIRST <= ord(char) <= _CHOSUNG_LAST for char in word)
+
+
+def word_tokens(word):
+    if len(word) == 1:
+        return {word}
+    return {word[i:i + 2] for i in range(len(word) - 1)}
+
+
+# 단어 하나의 색인 토큰 (초성 토큰 포함)
+def _index_tokens(word):
+    tokens = word_tokens(word)
+    if any(_is_hangul(char) for char in word):
+        tokens |= {_CHOSUNG_MARK + token for token in word_tokens(chosung(word))}
+    return tokens
+
+
+# 정규화한 내용의 색인 토큰
+# cache가 있으면 단어별 토큰을 기억해 둠 (같은 단어가 여러 루틴에 되풀이되므로 전체 색인을 만들 때 씀)
+def tokenize(text, cache=None):
+    tokens = set()
+    for word in _WORD.findall(text):
+        if cache is None:
+            tokens |= _index_tokens(word)
+            continue
+        word_set = cache.get(word)
+        if word_set is None:
+            word_set = cache[word] = _index_tokens(word)
+        tokens |= word_set
+    return tokens
+
+
+# text 안에서 word가 단어 전체/단어 앞부분/중간에 나오는지에 따른 가중치 (가장 좋은 경우)
+def _position_weight(text, word):
+    best = 0.0
+    pos = text.find(word)
+    while pos >= 0:
+        starts = pos == 0 or not text[pos - 1].isalnum()
+        end = pos + len(word)
+        ends = end == len(text) or not text[end].isalnum()
+        weight = 3.0 if starts and ends else 2.0 if starts else 1.0
+        if weight > best:
+            best = weight
+            if best == 3.0:
+                break
+        pos = text.find(word, pos + 1)
+    return best
+
+
+class SearchIndex:
+    def __init__(self, store):
+        self.store = store
+        self._postings = {}
+        # {id: 정규화한 내용}, None이면 아직 만들지 않음
+        self._texts = None
+        # {id: 저장 순서} (점수가 같을 때 순서, 내용을 고쳐도 그대로)
+        self._order = {}
+        store.subscribe(self._on_store_change)
+
+    def close(self):
+        self.store.unsubscribe(self._on_store_change)
+
+    def rebuild(self):
+        with span("search.rebuild"):
+            self._postings = {}
+            self._texts = {}
+            self._order = {}
+            cache = {}
+            for routine in self.store.routines:
+                self._add(routine, cache)
+
+    def _ensure(self):
+        # 다른 프로세스가 파일을 바꿨으면 여기서 다시 읽고 알림(None)을 받음
+        self.store.check_external_changes()
+        if self._texts is None:
+            self.rebuild()
+
+    def _add(self, routine, cache=None):
+        text = normalize(routine.content)
+        self._texts[routine.id] = text
+        self._order.setdefault(routine.id, len(self._order))
+        postings = self._postings
+        for token in tokenize(text, cache):
+            ids = postings.get(token)
+            if ids is None:
+                ids = postings[token] = set()
+            ids.add(routine.id)
+
+    def _remove(self, routine_id):
+        text = self._texts.pop(routine_id, None)
+        if text is None:
+            return
+        for token in tokenize(text):
+            ids = self._postings.get(token)
+            if ids is not None:
+                ids.discard(routine_id)
+                if not ids:
+                    del self._postings[token]
+
+    def _on_store_change(self, op):
+        if self._texts is None:
+            return
+        if op is None:
+            self._texts = None
+            return
+        kind = op["op"]
+        if kind == "add":
+            self._add(op["routine"])
+        elif kind == "delete":
+            self._remove(op["id"])
+            self._order.pop(op["id"], None)
+        elif kind == "update" and "content" in op["fields"]:
+            self._remove(op["id"])
+            routine = self.store.get(op["id"])
+            if routine is not None:
+                self._add(routine)
+
+    # 검색어 단어 하나를 포함하는 루틴 id 집합
+    def _candidates(self, word, chosung_mode):
+        prefix = _CHOSUNG_MARK if chosung_mode else ""
+        postings = self._postings
+        if len(word) == 1:
+            # 한 글자는 그 글자가 들어간 토큰 전체의 합집합
+            matched = set()
+            for token, ids in postings.items():
+                if word in token and (token[0] == _CHOSUNG_MARK) == chosung_mode:
+                    matched |= ids
+            return matched
+        sets = []
+        for token in word_tokens(word):
+            ids = postings.get(prefix + token)
+            if not ids:
+                return set()
+            sets.append(ids)
+        sets.sort(key=len)
+        matched = set(sets[0])
+        for ids in sets[1:]:
+            matched &= ids
+            if not matched:
+                break
+        if len(word) > 2:
+            texts = self._texts
+            if chosung_mode:
+                matched = {routine_id for routine_id in matched if word in chosung(texts[routine_id])}
+            else:
+                matched = {routine_id for routine_id in matched if word in texts[routine_id]}
+        return matched
+
+    # 검색어의 모든 단어를 포함하는 루틴을 점수 순으로 limit개: [(루틴, 점수, 다음 발생 시각 또는 None)]
+    # 점수: 단어마다 드문 정도(idf) * 위치 가중치(단어 전체 3, 단어 앞부분 2, 중간 1)의 합
+    # 점수가 같으면 내용이 짧은 것, 그다음 저장 순서
+    def search(self, query, limit=DEFAULT_LIMIT, now=None):
+        words = _WORD.findall(normalize(query))
+        if not words:
+            return []
+        with span("search.query"):
+            self._ensure()
+            total = len(self._texts)
+            matched = None
+            weights = []
+            for word in words:
+                chosung_mode = _is_chosung_query(word)
+                ids = self._candidates(word, chosung_mode)
+                weights.append((word, chosung_mode, math.log(1 + total / (1 + len(ids)))))
+                matched = ids if matched is None else matched & ids
+                if not matched:
+                    return []
+            texts = self._texts
+            order = self._order
+
+            def rank(routine_id):
+                text = texts[routine_id]
+                score = 0.0
+                for word, chosung_mode, idf in weights:
+                    score += idf * _position_weight(chosung(text) if chosung_mode else text, word)
+                return score, -len(text), -order[routine_id]
+
+            top = heapq.nlargest(limit, matched, key=rank)
+        now = now or datetime.now()
+        results = []
+        for routine_id in top:
+            routine = self.store.get(routine_id)
+            if routine is not None:
+                results.append((routine, rank(routine_id)[0], next_occurrence(routine, now)))
+        return results
@@ -0,0 +1,213 @@
+import json
+import sqlite3
+from contextlib import nullcontext
+from datetime import date
+
+from .model import Routine
+from .storage import JournalBackend, apply_op
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS routines (
+    id TEXT PRIMARY KEY,
+    time TEXT NOT NULL,
+    content TEXT NOT NULL,
+    frequency TEXT NOT NULL,
+    start_date TEXT NOT NULL,
+    weekday INTEGER NOT NULL,
+    day_of_month INTEGER NOT NULL,
+    extra TEXT
+);
+CREATE TABLE IF NOT EXISTS routine_dates (
+    date TEXT NOT NULL,
+    routine_id TEXT NOT NULL REFERENCES routines(id) ON DELETE CASCADE,
+    PRIMARY KEY (date, routine_id)
+);
+CREATE TABLE IF NOT EXISTS routine_moves (
+    date TEXT NOT NULL,
+    routine_id TEXT NOT NULL REFERENCES routines(id) ON DELETE CASCADE,
+    PRIMARY KEY (date, routine_id)
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE INDEX IF NOT EXISTS routines_start ON routines (frequency, start_date);
+CREATE INDEX IF NOT EXISTS routines_weekday ON routines (frequency, weekday, start_date);
+CREATE INDEX IF NOT EXISTS routines_day ON routines (frequency, day_of_month, start_date);
+CREATE INDEX IF NOT EXISTS routine_dates_routine ON routine_dates (routine_id);
+CREATE INDEX IF NOT EXISTS routine_moves_routine ON routine_moves (routine_id);
+"""
+
+# refresh_routines의 규칙을 SQL로 옮긴 것 (저장 순서 = rowid)
+# 반복 예외로 옮기거나 바꾼 발생은 routine_moves(옮겨 온 날짜)에서 찾고,
+# 건너뛴 발생은 SQL로 거르지 않고 routines_on에서 뺌
+QUERY_DATE = """
+SELECT rowid, * FROM routines WHERE frequency = 'daily' AND start_date <= :day
+UNION ALL
+SELECT rowid, * FROM routines
+    WHERE frequency = 'weekly' AND weekday = :weekday AND start_date <= :day
+UNION ALL
+SELECT rowid, * FROM routines
+    WHERE frequency = 'monthly' AND day_of_month = :day_of_month AND start_date <= :day
+UNION ALL
+SELECT r.rowid, r.* FROM routine_dates d JOIN routines r ON r.id = d.routine_id
+    WHERE d.date = :day AND r.frequency = 'once'
+UNION ALL
+SELECT r.rowid, r.* FROM routine_moves m JOIN routines r ON r.id = m.routine_id
+    WHERE m.date = :day
+ORDER BY 1
+"""
+
+
+# id, time, content, frequency, start_date는 컬럼으로, 나머지 필드는 extra에 JSON으로 저장
+def _row(routine):
+    start = date.fromisoformat(routine.start_date)
+    extra = dict(routine.extra or ())
+    if routine.dates is not None:
+        extra["dates"] = routine.dates
+    if routine.completed is not None:
+        extra["completed"] = routine.completed
+    if routine.exdates:
+        extra["exdates"] = routine.exdates
+    if routine.overrides:
+        extra["overrides"] = routine.overrides
+    return (routine.id, routine.time, routine.content, routine.frequency,
+            routine.start_date, start.toordinal() % 7, start.day,
+            json.dumps(extra, ensure_ascii=False) if extra else None)
+
+
+def _routine(row):
+    routine = Routine(row["time"], row["content"], row["frequency"], row["start_date"], row["id"])
+    if row["extra"]:
+        routine.update(json.loads(row["extra"]))
+    return routine
+
+
+# SQLite 저장 방식
+# - load/save/write는 JSON 저장 방식과 같은 약속을 따름
+# - WAL 모드라서 GUI가 쓰는 동안 다른 프로세스도 읽을 수 있음
+# - routines_on(day)는 전체를 읽지 않고 인덱스로 해당 날짜만 조회
+class SqliteBackend:
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path, timeout=10.0, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def load(self):
+        data = {row["key"]: json.loads(row["value"])
+                for row in self.conn.execute("SELECT key, value FROM meta")}
+        data["routines"] = [_routine(row) for row in self.conn.execute("SELECT * FROM routines ORDER BY rowid")]
+        return data
+
+    def save(self, data):
+        with self.conn:
+            self.conn.execute("DELETE FROM routine_dates")
+            self.conn.execute("DELETE FROM routine_moves")
+            self.conn.execute("DELETE FROM routines")
+            self.conn.execute("DELETE FROM meta")
+            self.conn.executemany(
+                "INSERT INTO meta (key, value) VALUES (?, ?)",
+                [(key, json.dumps(value, ensure_ascii=False)) for key, value in data.items() if key != "routines"])
+            for routine in data["routines"]:
+                self._upsert(routine)
+
+    # 다른 연결과 겹쳐도 레코드 단위로 반영되도록 쓰기 잠금을 먼저 잡고 현재 행에 적용
+    def write(self, ops, get_data):
+        with self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            for op in ops:
+                if op["op"] == "add":
+                    self._upsert(op["routine"])
+                    continue
+                routines = {op["id"]: self.get(op["id"])}
+                apply_op(routines, op)
+                if op["id"] in routines:
+                    self._upsert(routines[op["id"]])
+                else:
+                    self.conn.execute("DELETE FROM routines WHERE id = ?", (op["id"],))
+
+    # 변경 기록만 반영하고 get_data는 쓰지 않음
+    def snapshot_due(self, count):
+        return False
+
+    def _upsert(self, routine):
+        self.conn.execute(
+            "INSERT INTO routines (id, time, content, frequency, start_date, weekday, day_of_month, extra) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(id) DO UPDATE SET time = excluded.time, content = excluded.content, "
+            "frequency = excluded.frequency, start_date = excluded.start_date, weekday = excluded.weekday, "
+            "day_of_month = excluded.day_of_month, extra = excluded.extra",
+            _row(routine))
+        self.conn.execute("DELETE FROM routine_dates WHERE routine_id = ?", (routine.id,))
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO routine_dates (date, routine_id) VALUES (?, ?)",
+            [(day, routine.id) for day in routine.dates or ()])
+        self.conn.execute("DELETE FROM routine_moves WHERE routine_id = ?", (routine.id,))
+        if routine.exceptions is not None:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO routine_moves (date, routine_id) VALUES (?, ?)",
+                [(day, routine.id) for day in routine.exceptions[1]])
+
+    def get(self, routine_id):
+        row = self.conn.execute("SELECT * FROM routines WHERE id = ?", (routine_id,)).fetchone()
+        return _routine(row) if row else None
+
+    # 해당 날짜의 루틴 목록 (저장 순서)
+    def routines_on(self, day):
+        current = date.fromisoformat(day)
+        params = {"day": current.isoformat(), "weekday": current.toordinal() % 7, "day_of_month": current.day}
+        routines = []
+        seen = set()
+        for row in self.conn.execute(QUERY_DATE, params):
+            routine = _routine(row)
+            if routine.exceptions is not None:
+                skip, moved = routine.exceptions
+                if day in moved:
+                    # 같은 날 시간/내용만 바꾼 발생은 규칙과 routine_moves 양쪽에서 나옴
+                    if routine.id in seen:
+                        continue
+                    seen.add(routine.id)
+                    routine = routine.on(moved[day])
+                elif day in skip:
+                    continue
+            routines.append(routine)
+        return routines
+
+    # 다른 연결이 커밋하면 바뀌는 값 (자기 연결의 커밋으로는 바뀌지 않음)
+    def stat(self):
+        return self.conn.execute("PRAGMA data_version").fetchone()[0]
+
+    # SQLite가 자체적으로 잠금을 처리하므로 별도 파일 잠금은 쓰지 않음
+    def lock(self):
+        return nullcontext()
+
+
+def _dedupe_key(routine):
+    return (routine.time, routine.content, routine.frequency, routine.start_date, tuple(routine.dates or ()))
+
+
+# data.json 파일들(예: data.json, dist/data.json)을 SQLite 파일 하나로 옮김
+# 여러 파일에 같은 루틴이 있으면 하나만 남김, 옮긴 루틴 수를 돌려줌
+def migrate_json_to_sqlite(json_paths, db_path):
+    merged = {}
+    meta = {}
+    for path in json_paths:
+        data, _ = JournalBackend(path).read()
+        for routine in data.pop("routines"):
+            merged.setdefault(_dedupe_key(routine), routine)
+        data.pop("journal_seq", None)
+        for key, value in data.items():
+            meta.setdefault(key, value)
+    backend = SqliteBackend(db_path)
+    try:
+        backend.save(dict(meta, routines=list(merged.values())))
+    finally:
+        backend.close()
+    return len(merged)
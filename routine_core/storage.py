@@ -0,0 +1,273 @@
+import json
+import os
+
+from .completion import set_completed
+from .instrument import span
+from .locking import file_lock
+from .model import Routine, new_id
+
+# 데이터 파일 경로
+DATA_FILE = 'data.json'
+
+# 저널이 이만큼 쌓이면 스냅샷으로 합침
+COMPACT_EVERY = 1000
+
+# 스냅샷이 크면 루틴 수의 이 비율만큼 쌓일 때까지 기다림
+# (대량 가져오기에서 묶음마다 파일 전체를 다시 쓰지 않도록, 스냅샷 크기에 비례해서 합침)
+COMPACT_RATIO = 0.25
+
+
+def empty_data():
+    return {"routines": [], "repeating_routines": []}
+
+
+# id가 없는 루틴에 id를 붙임 (예전 data.json 마이그레이션), 새로 붙인 개수를 돌려줌
+def ensure_ids(routines):
+    count = 0
+    for routine in routines:
+        if routine.id is None:
+            routine.id = new_id()
+            count += 1
+    return count
+
+
+# json.dump의 default: Routine은 저장 형식 사전으로 씀
+def json_default(obj):
+    if isinstance(obj, Routine):
+        return obj.to_dict()
+    raise TypeError(f"JSON으로 저장할 수 없는 값: {type(obj).__name__}")
+
+
+# 변경 기록 하나를 {id: 루틴} 사전에 반영
+# idx가 들어 있는 기록은 id 도입 이전 저널 형식 (목록 위치 기준)
+def apply_op(routines, op):
+    kind = op["op"]
+    if kind == "add":
+        routine = op["routine"]
+        if isinstance(routine, dict):
+            # 저널에서 읽은 기록
+            routine = op["routine"] = Routine.from_dict(routine)
+        if routine.id is None:
+            routine.id = new_id()
+        routines[routine.id] = routine
+        return
+    routine_id = op["id"] if "id" in op else list(routines)[op["idx"]]
+    if kind == "update":
+        routines[routine_id].update(op["fields"])
+    elif kind == "delete":
+        del routines[routine_id]
+    elif kind == "complete":
+        set_completed(routines[routine_id], op["day"], op["done"])
+    else:
+        raise ValueError(f"알 수 없는 변경 종류: {kind}")
+
+
+# 저장할 데이터의 루틴 목록을 사전 목록으로 바꾼 얕은 복사본
+# (json.dump의 default로 하나씩 바꾸는 것보다 빠름)
+def plain_data(data):
+    routines = [routine.to_dict() if isinstance(routine, Routine) else routine
+                for routine in data.get("routines", ())]
+    return dict(data, routines=routines)
+
+
+# 임시 파일에 쓴 뒤 rename으로 교체 (쓰는 도중 죽어도 기존 파일은 그대로 남음)
+def atomic_write_json(path, data, indent=4):
+    tmp_path = f"{path}.tmp"
+    with span("storage.write"), open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(plain_data(data), f, ensure_ascii=False, indent=indent, default=json_default)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _stat(path):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _read_json(path):
+    if os.path.exists(path):
+        with span("storage.parse"), open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    else:
+        data = empty_data()
+    data["routines"] = [Routine.from_dict(routine) for routine in data.get("routines", [])]
+    return data
+
+
+# data.json 전체를 매번 다시 쓰는 방식
+# write()의 get_data는 전체 데이터를 돌려주는 함수 (필요할 때만 만들도록)
+class JsonFileBackend:
+    def __init__(self, path=DATA_FILE):
+        self.path = path
+
+    # 파일을 건드리지 않고 읽기 (id가 없던 루틴 수도 함께 돌려줌)
+    def read(self):
+        data = _read_json(self.path)
+        return data, ensure_ids(data["routines"])
+
+    def load(self):
+        data, migrated = self.read()
+        if migrated:
+            self.save(data)
+        return data
+
+    def save(self, data):
+        atomic_write_json(self.path, data)
+
+    def write(self, ops, get_data):
+        self.save(get_data())
+
+    # 변경 count건을 쓸 때 get_data()로 전체 데이터를 쓰는지
+    def snapshot_due(self, count):
+        return True
+
+    def stat(self):
+        return _stat(self.path)
+
+    def lock(self):
+        return file_lock(self.path)
+
+
+# 스냅샷(data.json) + 추가 전용 저널(data.json.journal, JSON Lines) 방식
+# - 변경 한 건마다 저널에 한 줄만 추가하므로 루틴 수와 상관없이 쓰기 비용이 일정함
+# - compact_every 건(스냅샷이 크면 루틴 수 * COMPACT_RATIO 건)마다 스냅샷을 원자적으로 교체하고 저널을 비움
+# - 스냅샷의 journal_seq보다 작거나 같은 기록은 이미 반영된 것이므로 다시 적용하지 않음
+# - 스냅샷 형식은 _read_snapshot/_write_snapshot이 담당 (binary_backend.py는 이 둘만 바꿈)
+class JournalBackend:
+    def __init__(self, path=DATA_FILE, compact_every=COMPACT_EVERY):
+        self.path = path
+        self.journal_path = f"{path}.journal"
+        self.compact_every = compact_every
+        self.seq = 0
+        self.pending = 0
+        self.snapshot_size = 0
+
+    # 파일을 건드리지 않고 스냅샷 + 저널 읽기 (id가 없던 루틴 수도 함께 돌려줌)
+    def read(self):
+        data = self._read_snapshot()
+        migrated = ensure_ids(data["routines"])
+        self.seq = data.get("journal_seq", 0)
+        self.pending = 0
+        self.snapshot_size = len(data["routines"])
+        if os.path.exists(self.journal_path):
+            routines = {routine.id: routine for routine in data["routines"]}
+            self._replay(routines)
+            data["routines"] = list(routines.values())
+        return data, migrated
+
+    def load(self):
+        data, migrated = self.read()
+        if migrated:
+            self.save(data)
+        return data
+
+    def _replay(self, routines):
+        good_end = 0
+        with span("storage.replay"), open(self.journal_path, 'rb') as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    op = json.loads(line.decode('utf-8'))
+                except ValueError:
+                    # 마지막 줄을 쓰다가 중단된 경우: 잘린 부분은 버림
+                    break
+                good_end += len(line)
+                if op["seq"] <= self.seq:
+                    continue
+                apply_op(routines, op)
+                self.seq = op["seq"]
+                self.pending += 1
+        if good_end < os.path.getsize(self.journal_path):
+            with open(self.journal_path, 'r+b') as f:
+                f.truncate(good_end)
+
+    def _read_snapshot(self):
+        return _read_json(self.path)
+
+    def _write_snapshot(self, data):
+        atomic_write_json(self.path, data)
+
+    def save(self, data):
+        data["journal_seq"] = self.seq
+        self._write_snapshot(data)
+        with open(self.journal_path, 'w', encoding='utf-8'):
+            pass
+        self.pending = 0
+        self.snapshot_size = len(data["routines"])
+
+    def write(self, ops, get_data):
+        if not ops:
+            return
+        lines = []
+        for op in ops:
+            self.seq += 1
+            lines.append(json.dumps(dict(op, seq=self.seq), ensure_ascii=False, default=json_default))
+        with span("storage.append"), open(self.journal_path, 'a', encoding='utf-8') as f:
+            f.write("\n".join(lines) + "\n")
+        self.pending += len(ops)
+        if self.snapshot_due(0):
+            self.save(get_data())
+
+    def snapshot_due(self, count):
+        return self.pending + count >= max(self.compact_every, int(self.snapshot_size * COMPACT_RATIO))
+
+    def stat(self):
+        return (_stat(self.path), _stat(self.journal_path))
+
+    def lock(self):
+        return file_lock(self.path)
+
+
+def _sqlite_backend(path):
+    # sqlite3는 SQLite 저장 방식을 쓸 때만 불러옴
+    from .sqlite_backend import SqliteBackend
+    return SqliteBackend(path)
+
+
+def _binary_backend(path):
+    from .binary_backend import BinaryBackend
+    return BinaryBackend(path)
+
+
+BACKENDS = {
+    "json": JsonFileBackend,
+    "journal": JournalBackend,
+    "sqlite": _sqlite_backend,
+    "binary": _binary_backend,
+}
+
+# 확장자로 저장 방식을 정하는 경우
+SQLITE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+BINARY_SUFFIXES = (".rtb",)
+
+
+# 저장 방식 선택
+# kind를 주지 않으면 .db/.sqlite 파일은 sqlite, .rtb 파일은 binary,
+# 나머지는 ROUTINE_STORAGE 환경 변수(기본 journal)
+def make_backend(path=DATA_FILE, kind=None):
+    if kind is None:
+        if path.endswith(SQLITE_SUFFIXES):
+            kind = "sqlite"
+        elif path.endswith(BINARY_SUFFIXES):
+            kind = "binary"
+        else:
+            kind = os.environ.get("ROUTINE_STORAGE", "journal")
+    try:
+        return BACKENDS[kind](path)
+    except KeyError:
+        raise ValueError(f"알 수 없는 저장 방식: {kind}") from None
+
+
+# 루틴 데이터 로드 함수
+def load_data(path=DATA_FILE):
+    return make_backend(path).load()
+
+
+# 루틴 데이터 저장 함수
+def save_data(data, path=DATA_FILE):
+    make_backend(path).save(data)
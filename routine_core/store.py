@@ -0,0 +1,324 @@
+import atexit
+import threading
+from contextlib import contextmanager
+
+from .instrument import count, span
+from .model import Routine
+from .recurrence import RecurrenceIndex, override_fields, skip_fields
+from .storage import DATA_FILE, apply_op, make_backend, new_id
+
+
+# 메모리에 올려둔 루틴 저장소
+# - 파일은 한 번만 읽고 이후 조회는 메모리에서 처리
+# - write_delay가 None이면 변경 즉시 저장(write-through), 초 단위 값이면 모아서 저장(write-behind)
+# - 다른 프로세스가 파일을 바꾸면 mtime/size 비교로 감지해서 다시 읽음
+# - 실제 파일 형식은 backend(storage.py)가 담당
+# - 날짜별 조회는 RecurrenceIndex를 통해 처리하고 변경 시 해당 루틴만 갱신
+# - 루틴은 고유 id로 찾음 ({id: Routine} 사전, 저장 순서 유지)
+# - 여러 프로세스가 같은 파일을 쓰면 저장 직전에 파일 상태(stat)를 비교해서(compare-and-swap)
+#   바뀌었으면 다시 읽고 내 변경을 레코드 단위로 얹은 뒤 저장 (conflicts에 횟수 기록)
+# - 저장할 변경과 (스냅샷을 쓸 때는) 루틴 복사본을 _lock 안에서 떼어 낸 뒤 _lock을 놓고 파일에 씀
+#   파일에 쓰는 동안에도 다른 스레드(서버의 이벤트 루프 등)는 조회/변경을 계속할 수 있음
+# - 잠금 순서는 _io_lock(저장/다시 읽기는 한 번에 하나) -> 파일 잠금 -> _lock
+#   _lock은 메모리 상태를 바꾸는 짧은 구간에만 잡고, _lock을 잡은 채로 파일 잠금을 기다리지 않음
+class RoutineStore:
+    def __init__(self, path=DATA_FILE, write_delay=None, backend=None):
+        self.path = path
+        self.write_delay = write_delay
+        self.backend = backend or make_backend(path)
+        self.version = 0
+        self.conflicts = 0
+        self._lock = threading.RLock()
+        self._io_lock = threading.Lock()
+        self._writing = False
+        self._timer = None
+        self._pending = []
+        self._batch_depth = 0
+        self._stat = None
+        self._meta = {}
+        self._routines = {}
+        self._list = None
+        self._columns = None
+        self._listeners = []
+        self.index = RecurrenceIndex()
+        self.reload()
+
+    def _file_stat(self):
+        return self.backend.stat()
+
+    # 디스크에서 다시 읽음 (저장하지 않은 변경은 버림)
+    def reload(self):
+        with self._io_lock:
+            with self.backend.lock():
+                data, stat = self._load()
+            with self._lock:
+                self._pending = []
+                self._install(data, stat)
+
+    # 파일 잠금을 잡은 상태에서 호출
+    def _load(self):
+        with span("store.load"):
+            data = self.backend.load()
+        return data, self._file_stat()
+
+    # 읽어 온 데이터로 바꾸고, 아직 저장하지 않은 변경(_pending)을 그 위에 다시 적용
+    # 다른 프로세스가 지운 루틴에 대한 변경은 버림 (레코드 단위 병합)
+    # _lock을 잡은 상태에서 호출
+    def _install(self, data, stat):
+        self._stat = stat
+        routines = {routine.id: routine for routine in data.pop("routines")}
+        merged = []
+        for op in self._pending:
+            if op["op"] != "add" and op["id"] not in routines:
+                continue
+            apply_op(routines, op)
+            merged.append(op)
+        self._pending = merged
+        self._meta = data
+        self._routines = routines
+        with span("index.rebuild"):
+            self.index.rebuild(routines.values())
+        self._changed()
+        self._notify(None)
+
+    # _lock을 잡은 채로 부르지 않음 (다시 읽을 때 파일 잠금을 기다려야 하므로)
+    def check_external_changes(self):
+        # 저장 대기 중인 변경이 있으면 메모리 쪽을 우선함
+        # 내가 파일에 쓰는 중이면 stat이 바뀌어도 다시 읽지 않음
+        if self._pending or self._writing or self._file_stat() == self._stat:
+            return False
+        with self._io_lock:
+            # 기다리는 동안 다른 스레드가 이미 다시 읽었거나 저장했을 수 있음
+            if self._pending or self._file_stat() == self._stat:
+                return False
+            with self.backend.lock():
+                data, stat = self._load()
+            # 읽는 동안 들어온 변경은 _install이 그 위에 다시 적용함
+            with self._lock:
+                self._install(data, stat)
+            return True
+
+    # 파일에 저장되는 형태의 전체 데이터
+    @property
+    def data(self):
+        return dict(self._meta, routines=self.routines)
+
+    @property
+    def routines(self):
+        self.check_external_changes()
+        with self._lock:
+            return self._routine_list()
+
+    # _lock을 잡은 상태에서 호출
+    def _routine_list(self):
+        if self._list is None:
+            self._list = list(self._routines.values())
+        return self._list
+
+    def get(self, routine_id):
+        self.check_external_changes()
+        return self._routines.get(routine_id)
+
+    # 해당 날짜에 해당하는 루틴 목록 (시간 순)
+    def routines_on(self, day):
+        self.check_external_changes()
+        with self._lock, span("index.query"):
+            return self.index.query(day)
+
+    # start~end(포함) 기간의 발생 내역 (numpy 배열 기반, occurrences.py 참고)
+    def occurrences(self, start, end):
+        from .occurrences import RoutineColumns, occurrences
+
+        self.check_external_changes()
+        with self._lock:
+            if self._columns is None or self._columns[0] != self.version:
+                self._columns = (self.version, RoutineColumns(self._routine_list()))
+            return occurrences(self._columns[1], start, end)
+
+    # routine은 Routine 또는 저장 형식 사전
+    # 이미 있는 id면 ValueError (덮어쓰면 예전 루틴이 인덱스에 남음)
+    def add_routine(self, routine):
+        if isinstance(routine, dict):
+            routine = Routine.from_dict(routine)
+        self.check_external_changes()
+        with self._lock:
+            if routine.id is None:
+                routine.id = new_id()
+            elif routine.id in self._routines:
+                raise ValueError(f"이미 있는 루틴 id입니다: {routine.id}")
+            self._apply({"op": "add", "routine": routine})
+        self._save_later()
+        return routine
+
+    def update_routine(self, routine_id, **fields):
+        with self._lock:
+            self._apply({"op": "update", "id": routine_id, "fields": fields})
+            routine = self._routines[routine_id]
+        self._save_later()
+        return routine
+
+    def delete_routine(self, routine_id):
+        with self._lock:
+            routine = self._routines[routine_id]
+            self._apply({"op": "delete", "id": routine_id})
+        self._save_later()
+        return routine
+
+    # 반복 루틴의 day 발생 하나만 건너뜀 (시리즈의 exdates에 기록)
+    def skip_occurrence(self, routine_id, day):
+        with self._lock:
+            fields = skip_fields(self._routines[routine_id], day)
+            self._apply({"op": "update", "id": routine_id, "fields": fields})
+            routine = self._routines[routine_id]
+        self._save_later()
+        return routine
+
+    # 반복 루틴의 day 발생 하나만 바꿈 (시리즈의 overrides에 기록, date를 주면 그 날짜로 옮김)
+    def override_occurrence(self, routine_id, day, **changes):
+        with self._lock:
+            fields = override_fields(self._routines[routine_id], day, changes)
+            self._apply({"op": "update", "id": routine_id, "fields": fields})
+            routine = self._routines[routine_id]
+        self._save_later()
+        return routine
+
+    # 해당 날짜의 완료 여부 기록 (completion.py의 비트셋)
+    def set_completed(self, routine_id, day, done):
+        with self._lock:
+            self._apply({"op": "complete", "id": routine_id, "day": day, "done": bool(done)})
+            routine = self._routines[routine_id]
+        self._save_later()
+        return routine
+
+    # _lock을 잡은 상태에서 호출
+    def _apply(self, op):
+        seq = None
+        if op["op"] in ("update", "delete"):
+            seq = self.index.remove(self._routines[op["id"]])
+        apply_op(self._routines, op)
+        if op["op"] == "add":
+            self.index.add(op["routine"])
+        elif op["op"] == "update":
+            self.index.add(self._routines[op["id"]], seq)
+        self._pending.append(op)
+        count("store.ops")
+        self._changed()
+        self._notify(op)
+
+    # 변경을 반영한 뒤 _lock을 놓고 호출: 바로 저장하거나(write-through) 저장 타이머를 검(write-behind)
+    def _save_later(self):
+        if self._batch_depth:
+            return
+        if self.write_delay is None:
+            self.flush()
+            return
+        with self._lock:
+            if self._timer is None:
+                self._timer = threading.Timer(self.write_delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    # 변경 알림 등록: callback(op)는 변경 하나마다, 파일을 다시 읽었을 때는 callback(None)
+    def subscribe(self, callback):
+        self._listeners.append(callback)
+
+    def unsubscribe(self, callback):
+        self._listeners.remove(callback)
+
+    def _notify(self, op):
+        for callback in list(self._listeners):
+            callback(op)
+
+    # with 블록 안의 변경을 모아서 한 번에 저장
+    @contextmanager
+    def batch(self):
+        with self._lock:
+            self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._batch_depth -= 1
+                done = not self._batch_depth
+            if done:
+                self.flush()
+
+    def _changed(self):
+        self.version += 1
+        self._list = None
+
+    def flush(self):
+        if not self._pending:
+            return
+        with self._io_lock:
+            self._flush()
+
+    # 잠금은 확인-쓰기 구간에만 잡음
+    # 마지막으로 읽은 뒤 다른 프로세스가 썼으면(stat 불일치) 다시 읽어서 병합한 뒤 씀
+    # _io_lock을 잡은 상태에서 호출
+    def _flush(self):
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._pending:
+                return
+        with span("store.flush"), self.backend.lock():
+            if self._file_stat() != self._stat:
+                self.conflicts += 1
+                data, stat = self._load()
+                with self._lock:
+                    self._install(data, stat)
+            # 스냅샷을 쓸 차례면 지금 상태를 복사해 둠 (쓰는 동안 루틴이 바뀔 수 있음)
+            self._write(lambda ops: self.backend.snapshot_due(len(ops)),
+                        lambda ops, data: self.backend.write(ops, lambda: data))
+
+    # 저널을 스냅샷으로 합치고 파일 전체를 새로 씀
+    def compact(self):
+        with self._io_lock:
+            self._flush()
+            with self.backend.lock():
+                if self._file_stat() != self._stat:
+                    data, stat = self._load()
+                    with self._lock:
+                        self._install(data, stat)
+                # 아직 저장하지 않은 변경도 스냅샷에 들어가므로 함께 떼어 냄
+                self._write(lambda ops: True, lambda ops, data: self.backend.save(data))
+
+    # 저장할 변경(과 필요하면 루틴 복사본)을 _lock 안에서 떼어 낸 뒤 _lock을 놓고 write(ops, data)
+    # _io_lock과 파일 잠금을 잡은 상태에서 호출
+    def _write(self, needs_data, write):
+        with self._lock:
+            ops, self._pending = self._pending, []
+            data = None
+            if needs_data(ops):
+                data = dict(self._meta, routines=[routine.copy() for routine in self._routines.values()])
+            self._writing = True
+        try:
+            if ops or data is not None:
+                write(ops, data)
+            self._stat = self._file_stat()
+        except BaseException:
+            # 쓰지 못한 변경은 다음 저장 때 다시 시도
+            with self._lock:
+                self._pending[:0] = ops
+            raise
+        finally:
+            self._writing = False
+
+
+_stores = {}
+
+
+# 경로별로 하나의 저장소를 공유
+def get_store(path=DATA_FILE, write_delay=None):
+    store = _stores.get(path)
+    if store is None:
+        store = _stores[path] = RoutineStore(path, write_delay)
+    return store
+
+
+@atexit.register
+def _flush_all():
+    for store in _stores.values():
+        store.flush()
@@ -0,0 +1,169 @@
+import tkinter as tk
+
+from routine_core.instrument import count, span
+from routine_core.model import ONCE
+
+# 한 줄 높이 (px)
+ROW_HEIGHT = 32
+
+
+# 루틴 한 줄을 그리는 위젯 묶음 (풀에서 재사용)
+class _RoutineRow:
+    def __init__(self, view):
+        self.view = view
+        self.routine = None
+        self.state = None
+
+        self.frame = tk.Frame(view.canvas)
+        self.default_bg = self.frame.cget("bg")
+        self.var = tk.IntVar()
+        self.check = tk.Checkbutton(self.frame, variable=self.var, command=self._on_toggle)
+        self.check.pack(side=tk.RIGHT, padx=5)
+        self.label = tk.Label(self.frame, anchor="w")
+        self.label.pack(side=tk.LEFT, padx=5)
+        tk.Button(self.frame, text="수정", command=self._on_modify).pack(side=tk.RIGHT, padx=5)
+        tk.Button(self.frame, text="삭제", command=self._on_delete).pack(side=tk.RIGHT, padx=5)
+        for widget in (self.frame, self.label):
+            widget.bind("<MouseWheel>", view._on_mousewheel)
+            widget.bind("<Button-4>", view._on_wheel_up)
+            widget.bind("<Button-5>", view._on_wheel_down)
+        self.window = view.canvas.create_window(
+            0, 0, window=self.frame, anchor="nw", height=ROW_HEIGHT - 2, state="hidden")
+
+    # 바뀐 속성만 다시 설정
+    def show(self, y, routine, state):
+        self.routine = routine
+        self.view.canvas.coords(self.window, 0, y)
+        if self.state == state:
+            return
+        text, bg, checked = state
+        old_text, old_bg, old_checked = self.state or (None, None, None)
+        if text != old_text:
+            self.label.config(text=text)
+        if bg != old_bg:
+            self.frame.config(bg=bg or self.default_bg)
+        if checked != old_checked:
+            self.var.set(checked)
+        if self.state is None:
+            self.view.canvas.itemconfigure(self.window, state="normal")
+        self.state = state
+
+    def hide(self):
+        if self.state is not None:
+            self.view.canvas.itemconfigure(self.window, state="hidden")
+        self.routine = None
+        self.state = None
+
+    def _on_toggle(self):
+        if self.routine is None:
+            return
+        checked = self.var.get()
+        text, bg, _ = self.state
+        self.state = (text, bg, checked)
+        if self.view.on_toggle:
+            self.view.on_toggle(self.routine, bool(checked))
+
+    def _on_modify(self):
+        if self.routine is not None:
+            self.view.on_modify(self.routine)
+
+    def _on_delete(self):
+        if self.routine is not None:
+            self.view.on_delete(self.routine)
+
+
+# 화면에 보이는 줄만 그리는 루틴 목록
+# - 보이는 줄 수만큼만 위젯을 만들어 두고 스크롤하면 내용만 바꿔 끼움
+# - set_items로 목록이 바뀌어도 위젯은 그대로 두고 달라진 부분만 갱신
+class VirtualRoutineList(tk.Frame):
+    def __init__(self, master, on_modify, on_delete, on_toggle=None, is_checked=None, **kwargs):
+        super().__init__(master, **kwargs)
+        self.on_modify = on_modify
+        self.on_delete = on_delete
+        self.on_toggle = on_toggle
+        self.is_checked = is_checked
+        self.items = []
+        self.top = 0
+        self.rows = []
+
+        self.canvas = tk.Canvas(self, highlightthickness=0, bg=kwargs.get("bg", "white"))
+        self.scrollbar = tk.Scrollbar(self, orient=tk.VERTICAL, command=self.yview)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        self.canvas.bind("<Configure>", self._on_configure)
+        for widget in (self.canvas, self):
+            widget.bind("<MouseWheel>", self._on_mousewheel)
+            widget.bind("<Button-4>", self._on_wheel_up)
+            widget.bind("<Button-5>", self._on_wheel_down)
+
+    # 줄 하나의 표시 내용: (글자, 배경색(None이면 기본색), 체크 여부)
+    def describe(self, routine):
+        # once 빈도 루틴 강조 표시 (배경색 변경)
+        bg = "yellow" if routine.freq == ONCE else None
+        checked = int(bool(self.is_checked and self.is_checked(routine)))
+        return (f"{routine.time} - {routine.content}", bg, checked)
+
+    def set_items(self, items):
+        self.items = items
+        self.top = min(self.top, self._max_top())
+        self._render()
+
+    def visible_count(self):
+        return max(1, self.canvas.winfo_height() // ROW_HEIGHT + 1)
+
+    def _max_top(self):
+        return max(0, len(self.items) - self.visible_count() + 1)
+
+    def _on_configure(self, event):
+        needed = event.height // ROW_HEIGHT + 1
+        while len(self.rows) < needed:
+            self.rows.append(_RoutineRow(self))
+            count("ui.rows_created")
+        for row in self.rows:
+            self.canvas.itemconfigure(row.window, width=event.width)
+        self.top = min(self.top, self._max_top())
+        self._render()
+
+    def _render(self):
+        with span("ui.render"):
+            for slot, row in enumerate(self.rows):
+                idx = self.top + slot
+                if idx < len(self.items):
+                    routine = self.items[idx]
+                    row.show(slot * ROW_HEIGHT, routine, self.describe(routine))
+                else:
+                    row.hide()
+            self._update_scrollbar()
+
+    def _update_scrollbar(self):
+        total = len(self.items)
+        if total == 0:
+            self.scrollbar.set(0, 1)
+            return
+        self.scrollbar.set(self.top / total, min(1, (self.top + self.visible_count()) / total))
+
+    # Scrollbar에서 호출하는 스크롤 명령 처리
+    def yview(self, *args):
+        if args[0] == "moveto":
+            top = int(float(args[1]) * len(self.items))
+        elif args[0] == "scroll":
+            step = int(args[1])
+            if args[2] == "pages":
+                step *= max(1, self.visible_count() - 1)
+            top = self.top + step
+        else:
+            return
+        top = max(0, min(top, self._max_top()))
+        if top != self.top:
+            self.top = top
+            self._render()
+
+    def _on_mousewheel(self, event):
+        self.yview("scroll", -1 if event.delta > 0 else 1, "units")
+
+    def _on_wheel_up(self, event):
+        self.yview("scroll", -1, "units")
+
+    def _on_wheel_down(self, event):
+        self.yview("scroll", 1, "units")
@@ -1,31 +1,17 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-import json
 from datetime import datetime, timedelta
-from tkcalendar import Calendar
-import os
-
-# 데이터 파일 경로
-DATA_FILE = 'data.json'
-
-# 루틴 데이터 로드 함수
-def load_data():
-    if os.path.exists(DATA_FILE):
-        with open(DATA_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    return {"routines": [], "repeating_routines": []}
-
-# 루틴 데이터 저장 함수
-def save_data(data):
-    with open(DATA_FILE, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=4)
-
-# 스타일 정의
-style = ttk.Style()
-style.configure("TButton", font=("Helvetica", 10), padding=6)
-style.configure("TLabel", font=("Helvetica", 12), background="lightblue")
-style.configure("TEntry", font=("Helvetica", 10), padding=6)
-style.configure("TCombobox", font=("Helvetica", 10), padding=6)
+from routine_core import get_store
+from routine_core.model import FREQUENCIES, ONCE, is_valid_time, make_routine
+from routine_core.recurrence import series_fields
+
+# 스타일 정의 (ttk.Style()은 Tk 창을 만들기 때문에 화면을 띄울 때 호출)
+def setup_style(root):
+    style = ttk.Style(root)
+    style.configure("TButton", font=("Helvetica", 10), padding=6)
+    style.configure("TLabel", font=("Helvetica", 12), background="lightblue")
+    style.configure("TEntry", font=("Helvetica", 10), padding=6)
+    style.configure("TCombobox", font=("Helvetica", 10), padding=6)
 
 # 루틴 추가 창 클래스
 class AddRoutineWindow(tk.Toplevel):
@@ -52,7 +38,7 @@ class AddRoutineWindow(tk.Toplevel):
         ttk.Label(self, text="빈도").grid(row=4, column=0, pady=10, padx=20, sticky="w")
         self.frequency_var = tk.StringVar()
         self.frequency_var.set("once")
-        self.frequency_combo = ttk.Combobox(self, textvariable=self.frequency_var, values=["once", "daily", "weekly", "monthly"], state='readonly')
+        self.frequency_combo = ttk.Combobox(self, textvariable=self.frequency_var, values=FREQUENCIES, state='readonly')
         self.frequency_combo.grid(row=5, column=0, pady=5, padx=20)
 
         # 저장 버튼
@@ -65,23 +51,11 @@ class AddRoutineWindow(tk.Toplevel):
         if not time or not content:
             messagebox.showerror("입력 오류", "모든 필드를 입력해주세요.")
             return
-        try:
-            datetime.strptime(time, "%H:%M")
-        except ValueError:
+        if not is_valid_time(time):
             messagebox.showerror("입력 오류", "시간 형식이 올바르지 않습니다.")
             return
 
-        data = load_data()
-        new_routine = {
-            "time": time,
-            "content": content,
-            "frequency": frequency,
-            "start_date": self.selected_date
-        }
-        if frequency == "once":
-            new_routine["dates"] = [self.selected_date]
-        data["routines"].append(new_routine)
-        save_data(data)
+        get_store().add_routine(make_routine(time, content, frequency, self.selected_date))
         self.refresh()
         self.destroy()
 
@@ -108,41 +82,36 @@ class ManageRepeatingRoutinesWindow(tk.Toplevel):
         ttk.Button(button_frame, text="삭제", command=self.delete_routine).pack(side=tk.RIGHT, padx=20)
 
     def load_repeating_routines(self):
-        data = load_data()
         for item in self.tree.get_children():
             self.tree.delete(item)
-        for idx, routine in enumerate(data["routines"]):
-            if routine["frequency"] != "once":
-                self.tree.insert("", "end", iid=idx, values=(routine["time"], routine["content"], routine["frequency"]))
+        for routine in get_store().routines:
+            if routine.freq != ONCE:
+                self.tree.insert("", "end", iid=routine.id, values=(routine.time, routine.content, routine.frequency))
 
     def modify_routine(self):
         selected = self.tree.focus()
         if not selected:
             messagebox.showerror("선택 오류", "수정할 루틴을 선택해주세요.")
             return
-        idx = int(selected)
-        routine = load_data()["routines"][idx]
-        ModifyRoutineWindow(self, idx, routine, self.load_repeating_routines, self.refresh_main)
+        routine = get_store().get(selected)
+        ModifyRoutineWindow(self, routine.id, routine, self.load_repeating_routines, self.refresh_main)
 
     def delete_routine(self):
         selected = self.tree.focus()
         if not selected:
             messagebox.showerror("선택 오류", "삭제할 루틴을 선택해주세요.")
             return
-        idx = int(selected)
-        data = load_data()
-        del data["routines"][idx]
-        save_data(data)
+        get_store().delete_routine(selected)
         self.load_repeating_routines()
         self.refresh_main()
 
 # 루틴 수정 창 클래스
 class ModifyRoutineWindow(tk.Toplevel):
-    def __init__(self, master, idx, routine, refresh_list, refresh_main):
+    def __init__(self, master, routine_id, routine, refresh_list, refresh_main):
         super().__init__(master)
         self.title("루틴 수정")
         self.geometry("300x250")
-        self.idx = idx
+        self.routine_id = routine_id
         self.routine = routine
         self.refresh_list = refresh_list
         self.refresh_main = refresh_main
@@ -152,20 +121,20 @@ class ModifyRoutineWindow(tk.Toplevel):
         # 시간 입력
         ttk.Label(self, text="시간 (HH:MM)").grid(row=0, column=0, pady=10, padx=20, sticky="w")
         self.time_entry = ttk.Entry(self)
-        self.time_entry.insert(0, routine["time"])
+        self.time_entry.insert(0, routine.time)
         self.time_entry.grid(row=1, column=0, pady=5, padx=20)
 
         # 내용 입력
         ttk.Label(self, text="내용").grid(row=2, column=0, pady=10, padx=20, sticky="w")
         self.content_entry = ttk.Entry(self)
-        self.content_entry.insert(0, routine["content"])
+        self.content_entry.insert(0, routine.content)
         self.content_entry.grid(row=3, column=0, pady=5, padx=20)
 
         # 빈도 선택
         ttk.Label(self, text="빈도").grid(row=4, column=0, pady=10, padx=20, sticky="w")
         self.frequency_var = tk.StringVar()
-        self.frequency_var.set(routine["frequency"])
-        self.frequency_combo = ttk.Combobox(self, textvariable=self.frequency_var, values=["once", "daily", "weekly", "monthly"], state='readonly')
+        self.frequency_var.set(routine.frequency)
+        self.frequency_combo = ttk.Combobox(self, textvariable=self.frequency_var, values=FREQUENCIES, state='readonly')
         self.frequency_combo.grid(row=5, column=0, pady=5, padx=20)
 
         # 저장 버튼
@@ -178,17 +147,13 @@ class ModifyRoutineWindow(tk.Toplevel):
         if not time or not content:
             messagebox.showerror("입력 오류", "모든 필드를 입력해주세요.")
             return
-        try:
-            datetime.strptime(time, "%H:%M")
-        except ValueError:
+        if not is_valid_time(time):
             messagebox.showerror("입력 오류", "시간 형식이 올바르지 않습니다.")
             return
 
-        data = load_data()
-        data["routines"][self.idx]["time"] = time
-        data["routines"][self.idx]["content"] = content
-        data["routines"][self.idx]["frequency"] = frequency
-        save_data(data)
+        store = get_store()
+        fields = series_fields(store.get(self.routine_id), dict(time=time, content=content, frequency=frequency))
+        store.update_routine(self.routine_id, **fields)
         self.refresh_list()
         self.refresh_main()
         self.destroy()
@@ -200,12 +165,14 @@ class RoutineApp:
         self.root.title("루틴 관리 프로그램")
         self.root.geometry("800x780")
         self.root.configure(bg='lightblue')
+        setup_style(self.root)
 
         # 현재 날짜 표시
         self.current_date = datetime.now().strftime("%Y-%m-%d")
         self.selected_date = self.current_date
 
-        # 캘린더 위젯
+        # 캘린더 위젯 (tkcalendar는 babel까지 불러오므로 화면을 만들 때 가져옴)
+        from tkcalendar import Calendar
         self.calendar = Calendar(self.root, selectmode="day", year=int(self.selected_date[:4]), month=int(self.selected_date[5:7]), day=int(self.selected_date[8:10]))
         self.calendar.pack(pady=20)
 
@@ -225,10 +192,9 @@ class RoutineApp:
 
     def load_routines(self):
         self.routine_listbox.delete(0, tk.END)
-        data = load_data()
-        for routine in data["routines"]:
-            if routine["start_date"] == self.selected_date:
-                self.routine_listbox.insert(tk.END, f"{routine['time']} - {routine['content']} ({routine['frequency']})")
+        for routine in get_store().routines:
+            if routine.start_date == self.selected_date:
+                self.routine_listbox.insert(tk.END, f"{routine.time} - {routine.content} ({routine.frequency})")
 
     def add_routine(self):
         AddRoutineWindow(self.root, self.selected_date, self.load_routines)
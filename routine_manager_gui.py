@@ -1,24 +1,14 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
-import json
+from tkinter import ttk, messagebox, filedialog
 from datetime import datetime, timedelta
-from tkcalendar import Calendar
-import os
-
-# 데이터 파일 경로
-DATA_FILE = 'data.json'
-
-# 루틴 데이터 로드 함수
-def load_data():
-    if os.path.exists(DATA_FILE):
-        with open(DATA_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    return {"routines": [], "repeating_routines": []}
-
-# 루틴 데이터 저장 함수
-def save_data(data):
-    with open(DATA_FILE, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=4)
+from routine_core import get_store, ics, instrument
+from routine_core.model import FREQUENCIES, ONCE, is_valid_time, make_routine
+from routine_core.completion import occurrence_completed
+from routine_core.date_cache import DateCache, neighbours
+from routine_core.recurrence import matches, series_fields
+from routine_core.reminders import ReminderScheduler
+from routine_core.search import SearchIndex
+from routine_list_view import VirtualRoutineList
 
 # 루틴 추가 창 클래스
 class AddRoutineWindow(tk.Toplevel):
@@ -43,7 +33,7 @@ class AddRoutineWindow(tk.Toplevel):
         tk.Label(self, text="빈도").pack(pady=5)
         self.frequency_var = tk.StringVar()
         self.frequency_var.set("once")
-        ttk.Combobox(self, textvariable=self.frequency_var, values=["once", "daily", "weekly", "monthly"], state='readonly').pack(pady=5)
+        ttk.Combobox(self, textvariable=self.frequency_var, values=FREQUENCIES, state='readonly').pack(pady=5)
 
         # 저장 버튼
         tk.Button(self, text="저장", command=self.save_routine).pack(pady=20)
@@ -55,23 +45,11 @@ class AddRoutineWindow(tk.Toplevel):
         if not time or not content:
             messagebox.showerror("입력 오류", "모든 필드를 입력해주세요.")
             return
-        try:
-            datetime.strptime(time, "%H:%M")
-        except ValueError:
+        if not is_valid_time(time):
             messagebox.showerror("입력 오류", "시간 형식이 올바르지 않습니다.")
             return
 
-        data = load_data()
-        new_routine = {
-            "time": time,
-            "content": content,
-            "frequency": frequency,
-            "start_date": self.selected_date
-        }
-        if frequency == "once":
-            new_routine["dates"] = [self.selected_date]
-        data["routines"].append(new_routine)
-        save_data(data)
+        get_store().add_routine(make_routine(time, content, frequency, self.selected_date))
         self.refresh()
         self.destroy()
 
@@ -95,41 +73,36 @@ class ManageRepeatingRoutinesWindow(tk.Toplevel):
         tk.Button(self, text="삭제", command=self.delete_routine).pack(side=tk.RIGHT, padx=20, pady=10)
 
     def load_repeating_routines(self):
-        data = load_data()
         for item in self.tree.get_children():
             self.tree.delete(item)
-        for idx, routine in enumerate(data["routines"]):
-            if routine["frequency"] != "once":
-                self.tree.insert("", "end", iid=idx, values=(routine["time"], routine["content"], routine["frequency"]))
+        for routine in get_store().routines:
+            if routine.freq != ONCE:
+                self.tree.insert("", "end", iid=routine.id, values=(routine.time, routine.content, routine.frequency))
 
     def modify_routine(self):
         selected = self.tree.focus()
         if not selected:
             messagebox.showerror("선택 오류", "수정할 루틴을 선택해주세요.")
             return
-        idx = int(selected)
-        routine = load_data()["routines"][idx]
-        ModifyRoutineWindow(self, idx, routine, self.load_repeating_routines, self.refresh_main)
+        routine = get_store().get(selected)
+        ModifyRoutineWindow(self, routine.id, routine, self.load_repeating_routines, self.refresh_main)
 
     def delete_routine(self):
         selected = self.tree.focus()
         if not selected:
             messagebox.showerror("선택 오류", "삭제할 루틴을 선택해주세요.")
             return
-        idx = int(selected)
-        data = load_data()
-        del data["routines"][idx]
-        save_data(data)
+        get_store().delete_routine(selected)
         self.load_repeating_routines()
         self.refresh_main()
 
 # 루틴 수정 창 클래스
 class ModifyRoutineWindow(tk.Toplevel):
-    def __init__(self, master, idx, routine, refresh_list, refresh_main):
+    def __init__(self, master, routine_id, routine, refresh_list, refresh_main):
         super().__init__(master)
         self.title("루틴 수정")
         self.geometry("300x250")
-        self.idx = idx
+        self.routine_id = routine_id
         self.routine = routine
         self.refresh_list = refresh_list
         self.refresh_main = refresh_main
@@ -137,20 +110,20 @@ class ModifyRoutineWindow(tk.Toplevel):
         # 시간 입력
         tk.Label(self, text="시간 (HH:MM)").pack(pady=5)
         self.time_entry = tk.Entry(self)
-        self.time_entry.insert(0, routine["time"])
+        self.time_entry.insert(0, routine.time)
         self.time_entry.pack(pady=5)
 
         # 내용 입력
         tk.Label(self, text="내용").pack(pady=5)
         self.content_entry = tk.Entry(self)
-        self.content_entry.insert(0, routine["content"])
+        self.content_entry.insert(0, routine.content)
         self.content_entry.pack(pady=5)
 
         # 빈도 선택
         tk.Label(self, text="빈도").pack(pady=5)
         self.frequency_var = tk.StringVar()
-        self.frequency_var.set(routine["frequency"])
-        ttk.Combobox(self, textvariable=self.frequency_var, values=["once", "daily", "weekly", "monthly"], state='readonly').pack(pady=5)
+        self.frequency_var.set(routine.frequency)
+        ttk.Combobox(self, textvariable=self.frequency_var, values=FREQUENCIES, state='readonly').pack(pady=5)
 
         # 저장 버튼
         tk.Button(self, text="저장", command=self.save_changes).pack(pady=20)
@@ -162,21 +135,277 @@ class ModifyRoutineWindow(tk.Toplevel):
         if not time or not content:
             messagebox.showerror("입력 오류", "모든 필드를 입력해주세요.")
             return
-        try:
-            datetime.strptime(time, "%H:%M")
-        except ValueError:
+        if not is_valid_time(time):
             messagebox.showerror("입력 오류", "시간 형식이 올바르지 않습니다.")
             return
 
-        data = load_data()
-        data["routines"][self.idx]["time"] = time
-        data["routines"][self.idx]["content"] = content
-        data["routines"][self.idx]["frequency"] = frequency
-        save_data(data)
+        store = get_store()
+        fields = series_fields(store.get(self.routine_id), dict(time=time, content=content, frequency=frequency))
+        store.update_routine(self.routine_id, **fields)
         self.refresh_list()
         self.refresh_main()
         self.destroy()
 
+# 반복 루틴의 발생 하나만 수정하는 창 (날짜를 바꾸면 그 날짜로 옮김)
+class ModifyOccurrenceWindow(tk.Toplevel):
+    def __init__(self, master, routine, day, refresh):
+        super().__init__(master)
+        self.title("이 날짜만 수정")
+        self.geometry("300x250")
+        self.routine_id = routine.id
+        self.day = day
+        self.refresh = refresh
+
+        # 날짜 입력
+        tk.Label(self, text="날짜 (YYYY-MM-DD)").pack(pady=5)
+        self.date_entry = tk.Entry(self)
+        self.date_entry.insert(0, day)
+        self.date_entry.pack(pady=5)
+
+        # 시간 입력
+        tk.Label(self, text="시간 (HH:MM)").pack(pady=5)
+        self.time_entry = tk.Entry(self)
+        self.time_entry.insert(0, routine.time)
+        self.time_entry.pack(pady=5)
+
+        # 내용 입력
+        tk.Label(self, text="내용").pack(pady=5)
+        self.content_entry = tk.Entry(self)
+        self.content_entry.insert(0, routine.content)
+        self.content_entry.pack(pady=5)
+
+        # 저장 버튼
+        tk.Button(self, text="저장", command=self.save_changes).pack(pady=20)
+
+    def save_changes(self):
+        day = self.date_entry.get()
+        time = self.time_entry.get()
+        content = self.content_entry.get()
+        if not day or not time or not content:
+            messagebox.showerror("입력 오류", "모든 필드를 입력해주세요.")
+            return
+        if not is_valid_time(time):
+            messagebox.showerror("입력 오류", "시간 형식이 올바르지 않습니다.")
+            return
+        try:
+            get_store().override_occurrence(self.routine_id, self.day, date=day, time=time, content=content)
+        except ValueError as e:
+            messagebox.showerror("입력 오류", str(e))
+            return
+        self.refresh()
+        self.destroy()
+
+# 루틴 검색 창: 입력을 멈추면 검색하고, 결과를 두 번 누르면 다음 발생 날짜로 이동
+class SearchWindow(tk.Toplevel):
+    # 마지막 입력 후 검색까지 기다리는 시간
+    DELAY_MS = 150
+
+    def __init__(self, master, search_index, go_to_date):
+        super().__init__(master)
+        self.title("루틴 검색")
+        self.geometry("520x400")
+        self.search_index = search_index
+        self.go_to_date = go_to_date
+
+        self.query_var = tk.StringVar()
+        self.query_var.trace_add("write", lambda *args: self.schedule_search())
+        entry = tk.Entry(self, textvariable=self.query_var)
+        entry.pack(fill=tk.X, padx=10, pady=10)
+        entry.focus_set()
+
+        self.tree = ttk.Treeview(self, columns=("Next", "Time", "Content", "Frequency"), show='headings')
+        self.tree.heading("Next", text="다음 발생")
+        self.tree.heading("Time", text="시간")
+        self.tree.heading("Content", text="내용")
+        self.tree.heading("Frequency", text="빈도")
+        self.tree.column("Next", width=100)
+        self.tree.column("Time", width=60)
+        self.tree.column("Frequency", width=70)
+        self.tree.pack(fill=tk.BOTH, expand=True, padx=10)
+        self.tree.bind("<Double-1>", self.on_open)
+
+        self.status_label = tk.Label(self, anchor="w")
+        self.status_label.pack(fill=tk.X, padx=10, pady=5)
+
+        self._job = None
+
+    def schedule_search(self):
+        if self._job is not None:
+            self.after_cancel(self._job)
+        self._job = self.after(self.DELAY_MS, self.run_search)
+
+    def run_search(self):
+        self._job = None
+        self.tree.delete(*self.tree.get_children())
+        query = self.query_var.get()
+        if not query.strip():
+            self.status_label.config(text="")
+            return
+        results = self.search_index.search(query)
+        for routine, score, due in results:
+            next_day = due.strftime("%Y-%m-%d") if due else "-"
+            self.tree.insert("", "end", iid=routine.id,
+                             values=(next_day, routine.time, routine.content, routine.frequency))
+        self.status_label.config(text=f"{len(results)}개 결과")
+
+    def on_open(self, event):
+        item = self.tree.focus()
+        if not item:
+            return
+        next_day = self.tree.set(item, "Next")
+        if next_day == "-":
+            messagebox.showinfo("루틴 검색", "앞으로 남은 발생이 없습니다.", parent=self)
+            return
+        self.go_to_date(next_day)
+
+    def destroy(self):
+        if self._job is not None:
+            self.after_cancel(self._job)
+            self._job = None
+        super().destroy()
+
+# 통계 창: 기간을 정해 완료율, 연속 완료, 시간대별 부하를 보여 줌
+class StatsWindow(tk.Toplevel):
+    # 시간대 막대 그래프의 최대 길이 (글자 수)
+    BAR_WIDTH = 30
+
+    def __init__(self, master, analytics):
+        super().__init__(master)
+        self.title("통계")
+        self.geometry("480x560")
+        self.analytics = analytics
+
+        range_frame = tk.Frame(self)
+        range_frame.pack(pady=10)
+        today = datetime.now()
+        tk.Label(range_frame, text="시작").pack(side=tk.LEFT)
+        self.start_entry = tk.Entry(range_frame, width=12)
+        self.start_entry.insert(0, today.strftime("%Y-01-01"))
+        self.start_entry.pack(side=tk.LEFT, padx=5)
+        tk.Label(range_frame, text="끝").pack(side=tk.LEFT)
+        self.end_entry = tk.Entry(range_frame, width=12)
+        self.end_entry.insert(0, today.strftime("%Y-%m-%d"))
+        self.end_entry.pack(side=tk.LEFT, padx=5)
+        tk.Button(range_frame, text="계산", command=self.refresh).pack(side=tk.LEFT, padx=5)
+
+        self.output = tk.Text(self, font=("Courier", 10))
+        self.output.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        self.refresh()
+
+    def refresh(self):
+        from routine_core.analytics import summary_lines
+
+        try:
+            stats = self.analytics.stats(self.start_entry.get(), self.end_entry.get())
+        except ValueError as e:
+            messagebox.showerror("입력 오류", str(e), parent=self)
+            return
+        lines = summary_lines(stats)
+        lines.append("")
+        lines.append("시간대별 예정 발생:")
+        by_hour = stats.by_hour
+        peak = max(int(by_hour.max()), 1)
+        for hour, total in enumerate(by_hour):
+            if total:
+                lines.append(f"{hour:02d}시 {'#' * max(1, int(total) * self.BAR_WIDTH // peak):<{self.BAR_WIDTH}} {total}")
+        self.output.delete("1.0", tk.END)
+        self.output.insert(tk.END, "\n".join(lines))
+
+# 디버그 창: 구간별 최근/평균/최대 시간, 카운터, 메모리 사용량 (1초마다 갱신)
+# CPU 프로파일(cProfile)과 메모리 추적(tracemalloc)을 여기서 켜고 끌 수 있음
+class DebugPanel(tk.Toplevel):
+    REFRESH_MS = 1000
+
+    def __init__(self, master, date_cache):
+        super().__init__(master)
+        self.title("디버그")
+        self.geometry("520x520")
+        self.date_cache = date_cache
+
+        self.tree = ttk.Treeview(self, columns=("Last", "Avg", "Max", "Count"), height=10)
+        self.tree.heading("#0", text="구간")
+        self.tree.heading("Last", text="최근 ms")
+        self.tree.heading("Avg", text="평균 ms")
+        self.tree.heading("Max", text="최대 ms")
+        self.tree.heading("Count", text="횟수")
+        self.tree.column("#0", width=160)
+        for column in ("Last", "Avg", "Max", "Count"):
+            self.tree.column(column, width=80, anchor="e")
+        self.tree.pack(fill=tk.X, padx=10, pady=10)
+
+        self.status_label = tk.Label(self, justify=tk.LEFT, anchor="w")
+        self.status_label.pack(fill=tk.X, padx=10)
+
+        btn_frame = tk.Frame(self)
+        btn_frame.pack(pady=5)
+        self.profile_button = tk.Button(btn_frame, command=self.toggle_profile)
+        self.profile_button.pack(side=tk.LEFT, padx=5)
+        self.memory_button = tk.Button(btn_frame, command=self.toggle_memory)
+        self.memory_button.pack(side=tk.LEFT, padx=5)
+        tk.Button(btn_frame, text="초기화", command=self.reset).pack(side=tk.LEFT, padx=5)
+
+        self.output = tk.Text(self, height=12, font=("Courier", 9))
+        self.output.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+
+        self._job = None
+        self.refresh()
+
+    def refresh(self):
+        spans, counters = instrument.snapshot()
+        for item in self.tree.get_children():
+            if item not in spans:
+                self.tree.delete(item)
+        for name in sorted(spans):
+            s = spans[name]
+            values = (f"{s['last'] * 1000:.2f}", f"{s['total'] / s['count'] * 1000:.2f}",
+                      f"{s['max'] * 1000:.2f}", s["count"])
+            if self.tree.exists(name):
+                self.tree.item(name, values=values)
+            else:
+                self.tree.insert("", "end", iid=name, text=name, values=values)
+
+        current, peak = instrument.memory_usage()
+        if current is not None:
+            memory = f"메모리(tracemalloc): 현재 {current / 2**20:.1f} MB, 최대 {peak / 2**20:.1f} MB"
+        elif peak is not None:
+            memory = f"메모리(프로세스 최대): {peak / 2**20:.1f} MB"
+        else:
+            memory = "메모리: 알 수 없음"
+        lines = [memory, f"날짜 캐시: 적중 {self.date_cache.hits}, 실패 {self.date_cache.misses}"]
+        lines += [f"{name}: {value}" for name, value in sorted(counters.items())]
+        self.status_label.config(text="\n".join(lines))
+
+        self.profile_button.config(text="CPU 프로파일 중지" if instrument.profiling() else "CPU 프로파일 시작")
+        self.memory_button.config(text="메모리 추적 중지" if instrument.tracing_memory() else "메모리 추적 시작")
+        self._job = self.after(self.REFRESH_MS, self.refresh)
+
+    def toggle_profile(self):
+        if instrument.profiling():
+            self._show(instrument.stop_profile())
+        else:
+            instrument.start_profile()
+
+    def toggle_memory(self):
+        if instrument.tracing_memory():
+            self._show("\n".join(instrument.top_allocations()))
+            instrument.stop_memory()
+        else:
+            instrument.start_memory()
+
+    def reset(self):
+        instrument.reset()
+        self.tree.delete(*self.tree.get_children())
+
+    def _show(self, text):
+        self.output.delete("1.0", tk.END)
+        self.output.insert(tk.END, text)
+
+    def destroy(self):
+        if self._job is not None:
+            self.after_cancel(self._job)
+            self._job = None
+        super().destroy()
+
 # 메인 애플리케이션 클래스
 class RoutineApp:
     def __init__(self, root):
@@ -185,20 +414,47 @@ class RoutineApp:
         self.root.geometry("800x780")
         self.root.configure(bg='white')
 
+        # 도구 메뉴 (iCalendar 가져오기/내보내기, 디버그 창 F12)
+        menubar = tk.Menu(root)
+        tools_menu = tk.Menu(menubar, tearoff=0)
+        tools_menu.add_command(label="검색...", accelerator="Ctrl+F", command=self.open_search)
+        tools_menu.add_command(label="통계...", command=self.open_stats)
+        tools_menu.add_separator()
+        tools_menu.add_command(label="iCalendar 가져오기...", command=self.import_ics)
+        tools_menu.add_command(label="iCalendar 내보내기...", command=self.export_ics)
+        tools_menu.add_separator()
+        tools_menu.add_command(label="디버그 창", accelerator="F12", command=self.open_debug_panel)
+        menubar.add_cascade(label="도구", menu=tools_menu)
+        self.root.config(menu=menubar)
+        self.root.bind("<F12>", lambda event: self.open_debug_panel())
+        self.root.bind("<Control-f>", lambda event: self.open_search())
+        self.debug_panel = None
+        self.search_window = None
+        self.analytics = None
+
         # 현재 날짜 표시
         self.current_date = datetime.now().strftime("%Y-%m-%d")
         self.selected_date = self.current_date
         self.date_label = tk.Label(root, text=self.current_date, font=("Helvetica", 18, "bold"), bg="white")
         self.date_label.pack(pady=20)
 
-        # 날짜 선택
+        # 날짜 선택 (tkcalendar는 babel까지 불러오므로 화면을 만들 때 가져옴)
+        from tkcalendar import Calendar
         self.calendar = Calendar(root, firstweekday='sunday', mindate=datetime(2020,1,1), maxdate=datetime(2030,12,31))
         self.calendar.pack(pady=20)
         self.calendar.bind("<<CalendarSelected>>", self.on_date_select)
 
-        # 루틴 리스트
-        self.routine_frame = tk.Frame(root, bg="white")
-        self.routine_frame.pack(pady=5, fill=tk.BOTH, expand=True)
+        # 날짜별 루틴 목록 캐시
+        self.date_cache = DateCache(get_store())
+
+        # 내용 검색 색인 (처음 검색할 때 만들고 이후에는 바뀐 루틴만 고침)
+        self.search_index = SearchIndex(get_store())
+
+        # 루틴 리스트 (보이는 줄만 그리는 목록)
+        self.routine_list = VirtualRoutineList(
+            root, self.modify_routine, self.delete_routine,
+            on_toggle=self.toggle_routine, is_checked=self.is_routine_completed, bg="white")
+        self.routine_list.pack(pady=5, fill=tk.BOTH, expand=True)
         self.refresh_routines()
 
         # 버튼 프레임
@@ -207,6 +463,11 @@ class RoutineApp:
 
         tk.Button(btn_frame, text="루틴 추가", command=self.open_add_routine, bg ="whitesmoke", relief="raised").pack(side=tk.LEFT, padx=10)
         tk.Button(btn_frame, text="반복 루틴 관리", command=self.open_manage_repeating, bg="whitesmoke", relief="raised").pack(side=tk.LEFT, padx=10)
+        tk.Button(btn_frame, text="검색", command=self.open_search, bg="whitesmoke", relief="raised").pack(side=tk.LEFT, padx=10)
+
+        # 루틴 시간 알림 (다음 알림 시각까지 after()로 대기)
+        self.reminders = ReminderScheduler(get_store(), self.notify_routine)
+        self.reminders.attach_tk(self.root)
 
     def on_date_select(self, event):
         self.selected_date = self.calendar.selection_get().strftime("%Y-%m-%d")
@@ -219,118 +480,124 @@ class RoutineApp:
     def open_manage_repeating(self):
         ManageRepeatingRoutinesWindow(self.root, self.refresh_routines)
 
-    def refresh_routines(self):
-        for widget in self.routine_frame.winfo_children():
-            widget.destroy()
-            
-        data = load_data()
-        routines_today = []
-        
-        for routine in data["routines"]:
-            if routine["frequency"] == "once":
-                if routine["dates"] and self.selected_date in routine["dates"]:
-                    routines_today.append(routine)
-            else:
-                start_date = datetime.strptime(routine["start_date"], "%Y-%m-%d")
-                current = datetime.strptime(self.selected_date, "%Y-%m-%d")
-                if current < start_date:
-                    continue
-                if routine["frequency"] == "daily":
-                    routines_today.append(routine)
-                elif routine["frequency"] == "weekly":
-                    delta = current - start_date
-                    if delta.days % 7 == 0:
-                        routines_today.append(routine)
-                elif routine["frequency"] == "monthly":
-                    if start_date.day == current.day:
-                        routines_today.append(routine)
-
-        # 시간 순으로 정렬 (HH:MM 형식의 문자열을 datetime으로 변환하여 정렬)
-        routines_today.sort(key=lambda r: datetime.strptime(r["time"], "%H:%M"))
-
-        for idx, routine in enumerate(routines_today):
-            frame = tk.Frame(self.routine_frame)
-            frame.pack(fill=tk.X, pady=2)
-            
-            # once 빈도 루틴 강조 표시 (배경색 변경)
-            if routine["frequency"] == "once":
-                frame.config(bg="yellow")  # 강조할 색을 원하는 색으로 설정
-            
-            var = tk.IntVar()
-            chk = tk.Checkbutton(frame, variable=var)
-            chk.pack(side=tk.RIGHT, padx=5)
-            
-            # 강조 색이 적용된 라벨
-            label = tk.Label(frame, text=f"{routine['time']} - {routine['content']}")
-            label.pack(side=tk.LEFT, padx=5)
-            
-            # 수정 버튼
-            tk.Button(frame, text="수정", command=lambda r=routine: self.modify_routine(r)).pack(side=tk.RIGHT, padx=5)
-            
-            # 삭제 버튼
-            tk.Button(frame, text="삭제", command=lambda r=routine: self.delete_routine(r)).pack(side=tk.RIGHT, padx=5)
+    def open_debug_panel(self):
+        if self.debug_panel is not None and self.debug_panel.winfo_exists():
+            self.debug_panel.lift()
+            return
+        self.debug_panel = DebugPanel(self.root, self.date_cache)
 
+    def open_search(self):
+        if self.search_window is not None and self.search_window.winfo_exists():
+            self.search_window.lift()
+            return
+        self.search_window = SearchWindow(self.root, self.search_index, self.go_to_date)
+
+    # 통계는 numpy가 필요하므로 처음 열 때 불러옴 (이후에는 달별 집계 캐시를 계속 씀)
+    def open_stats(self):
+        if self.analytics is None:
+            from routine_core.analytics import Analytics
+            self.analytics = Analytics(get_store())
+        StatsWindow(self.root, self.analytics)
+
+    # 달력에서 day(YYYY-MM-DD)를 선택하고 그 날짜의 목록을 보여 줌
+    def go_to_date(self, day):
+        selected = datetime.strptime(day, "%Y-%m-%d").date()
+        self.calendar.selection_set(selected)
+        self.calendar.see(selected)
+        self.on_date_select(None)
+
+    # .ics 파일을 한 줄씩 읽어서 묶음 단위로 저장 (루틴마다 저장하지 않음)
+    def import_ics(self):
+        path = filedialog.askopenfilename(parent=self.root, title="iCalendar 가져오기",
+                                          filetypes=[("iCalendar", "*.ics"), ("모든 파일", "*.*")])
+        if not path:
+            return
+        try:
+            with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+                added, skipped = ics.import_ics(get_store(), f)
+        except (OSError, UnicodeDecodeError) as e:
+            messagebox.showerror("가져오기 오류", str(e))
+            return
+        lines = [f"{added}개 루틴을 가져왔습니다."]
+        lines += [f"건너뜀 ({reason}): {count}개" for reason, count in skipped.most_common()]
+        messagebox.showinfo("iCalendar 가져오기", "\n".join(lines))
+        self.refresh_routines()
 
-    def modify_routine(self, routine):
-        data = load_data()
-        idx = data["routines"].index(routine)
-        
-        # 루틴이 "once"일 경우에는 수정 가능
-        if routine["frequency"] == "once":
-            ModifyRoutineWindow(self.root, idx, routine, self.refresh_routines, self.refresh_routines)
+    def export_ics(self):
+        path = filedialog.asksaveasfilename(parent=self.root, title="iCalendar 내보내기", defaultextension=".ics",
+                                            filetypes=[("iCalendar", "*.ics")])
+        if not path:
+            return
+        try:
+            with open(path, 'w', encoding='utf-8', newline='') as f:
+                count = ics.write_ics(get_store().routines, f)
+        except OSError as e:
+            messagebox.showerror("내보내기 오류", str(e))
             return
+        messagebox.showinfo("iCalendar 내보내기", f"{count}개 일정을 내보냈습니다.")
 
-        # "daily", "weekly", "monthly" 루틴은 당일만 수정 가능
-        today = datetime.strptime(self.selected_date, "%Y-%m-%d")
-        start_date = datetime.strptime(routine["start_date"], "%Y-%m-%d")
-        
-        if routine["frequency"] == "daily" and today >= start_date:
-            ModifyRoutineWindow(self.root, idx, routine, self.refresh_routines, self.refresh_routines)
-        elif routine["frequency"] == "weekly":
-            delta = today - start_date
-            if delta.days % 7 == 0:  # 오늘이 주기적으로 반복되는 주기인 경우
-                ModifyRoutineWindow(self.root, idx, routine, self.refresh_routines, self.refresh_routines)
-        elif routine["frequency"] == "monthly":
-            if today.day == start_date.day:  # 오늘이 월별 반복 주기인 경우
-                ModifyRoutineWindow(self.root, idx, routine, self.refresh_routines, self.refresh_routines)
-        else:
+    def refresh_routines(self):
+        with instrument.span("ui.refresh"):
+            # 시간 순으로 정렬된 목록 (캐시에 있으면 바로 사용)
+            routines_today = self.date_cache.get(self.selected_date)
+            self.routine_list.set_items(routines_today)
+
+        # 주변 날짜는 화면이 한가할 때 미리 계산
+        day = self.selected_date
+        self.root.after_idle(lambda: self.date_cache.prefetch(neighbours(day)))
+
+    def notify_routine(self, routine, due):
+        self.root.bell()
+        messagebox.showinfo("루틴 알림", f"{routine.time} - {routine.content}")
+
+    def is_routine_completed(self, routine):
+        return occurrence_completed(get_store(), routine, self.selected_date)
+
+    # 체크 상태를 날짜별 완료 기록으로 저장
+    def toggle_routine(self, routine, checked):
+        get_store().set_completed(routine.id, self.selected_date, checked)
+
+    # 반복 루틴이면 이 날짜의 발생만 바꿀지 반복 전체를 바꿀지 물어봄 (취소하면 None)
+    def ask_scope(self, routine, action):
+        if routine.freq == ONCE:
+            return "series"
+        answer = messagebox.askyesnocancel(
+            f"반복 루틴 {action}", f"이 날짜({self.selected_date})의 일정만 {action}할까요?\n\n"
+                                 f"예: 이 날짜만\n아니요: 반복 전체")
+        if answer is None:
+            return None
+        return "occurrence" if answer else "series"
+
+    def modify_routine(self, routine):
+        # 반복 루틴은 해당 루틴이 있는 날에만 수정 가능
+        if not matches(routine, self.selected_date):
             messagebox.showinfo("수정 불가", "이 루틴은 오늘 수정할 수 없습니다.")
+            return
+        scope = self.ask_scope(routine, "수정")
+        if scope == "occurrence":
+            # 목록의 항목은 이 날짜에 바뀐 시간/내용이 적용된 발생일 수 있음
+            ModifyOccurrenceWindow(self.root, routine, self.selected_date, self.refresh_routines)
+        elif scope == "series":
+            series = get_store().get(routine.id)
+            ModifyRoutineWindow(self.root, series.id, series, self.refresh_routines, self.refresh_routines)
 
     def delete_routine(self, routine):
-        data = load_data()
-        idx = data["routines"].index(routine)
-        
-        # 루틴이 "once"일 경우에는 삭제 가능
-        if routine["frequency"] == "once":
-            data["routines"].remove(routine)
-            save_data(data)
-            self.refresh_routines()
+        # 반복 루틴은 해당 루틴이 있는 날에만 삭제 가능
+        if not matches(routine, self.selected_date):
+            messagebox.showinfo("삭제 불가", "이 루틴은 오늘 삭제할 수 없습니다.")
             return
-
-        # "daily", "weekly", "monthly" 루틴은 당일만 삭제 가능
-        today = datetime.strptime(self.selected_date, "%Y-%m-%d")
-        start_date = datetime.strptime(routine["start_date"], "%Y-%m-%d")
-
-        if routine["frequency"] == "daily" and today >= start_date:
-            data["routines"].remove(routine)
-            save_data(data)
-            self.refresh_routines()
-        elif routine["frequency"] == "weekly":
-            delta = today - start_date
-            if delta.days % 7 == 0:  # 오늘이 주기적으로 반복되는 주기인 경우
-                data["routines"].remove(routine)
-                save_data(data)
-                self.refresh_routines()
-        elif routine["frequency"] == "monthly":
-            if today.day == start_date.day:  # 오늘이 월별 반복 주기인 경우
-                data["routines"].remove(routine)
-                save_data(data)
-                self.refresh_routines()
+        scope = self.ask_scope(routine, "삭제")
+        if scope == "occurrence":
+            get_store().skip_occurrence(routine.id, self.selected_date)
+        elif scope == "series":
+            get_store().delete_routine(routine.id)
         else:
-            messagebox.showinfo("삭제 불가", "이 루틴은 오늘 삭제할 수 없습니다.")
+            return
+        self.refresh_routines()
 
 
 if __name__ == "__main__":
+    instrument.configure_from_env()
     root = tk.Tk()
     app = RoutineApp(root)
     root.mainloop()
@@ -10,7 +10,9 @@ a = Analysis(
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=[],
+    # GUI에서 쓰지 않는 모듈 (서버/CLI 전용 모듈 등)
+    # numpy는 도구 > 통계(routine_core.analytics)에서 쓰므로 넣어야 함
+    excludes=['asyncio', 'unittest', 'pydoc', 'doctest', 'xmlrpc', 'multiprocessing'],
     noarchive=False,
     optimize=0,
 )
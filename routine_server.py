@@ -0,0 +1,243 @@
+import argparse
+import asyncio
+import json
+import os
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+from routine_core import DATA_FILE, RoutineStore, instrument
+from routine_core.completion import is_completed, occurrence_completed
+from routine_core.recurrence import matches, occurrence_origin
+
+# index.html 경로
+INDEX_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'index.html')
+
+# 변경 사항을 모아서 저장하는 간격 (초)
+WRITE_DELAY = 0.5
+
+# 요청 본문 최대 크기
+MAX_BODY = 64 * 1024
+
+# 날짜별 응답 본문을 기억해 두는 개수 (LRU)
+CACHE_SIZE = 128
+
+
+class HttpError(Exception):
+    def __init__(self, status, message=None):
+        super().__init__(message or status.phrase)
+        self.status = status
+
+
+# index.html이 사용하는 API를 제공하는 로컬 서버
+# - GET  /routines?date=YYYY-MM-DD  해당 날짜의 루틴 목록 (ETag / If-None-Match 지원)
+# - POST /routine/update            id, name, is_completed (date 생략 시 오늘)
+# - POST /routine/delete            id
+# 저장은 RoutineStore의 write-behind로 모아서 처리하므로 요청 처리 중 디스크를 기다리지 않음
+class RoutineServer:
+    def __init__(self, store):
+        self.store = store
+        # 서버를 다시 띄우면 version이 처음부터 시작하므로 ETag에 실행마다 다른 값을 섞음
+        self.instance = uuid.uuid4().hex[:8]
+        self._cache = OrderedDict()
+        with open(INDEX_FILE, 'rb') as f:
+            self.index_html = f.read()
+
+    def etag(self, day):
+        return f'W/"{self.instance}-{self.store.version}-{day}"'
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                except HttpError as e:
+                    # 본문 길이를 알 수 없으므로 응답하고 연결을 닫음
+                    await self._write_response(writer, e.status, {}, self._json({"error": str(e)}), False)
+                    break
+                if request is None:
+                    break
+                method, target, headers, body = request
+                # 다른 프로세스가 바꾼 파일을 다시 읽는 일(파일 잠금 대기 포함)은 이벤트 루프 밖에서
+                await asyncio.to_thread(self.store.check_external_changes)
+                try:
+                    status, extra, payload = self.dispatch(method, target, headers, body)
+                except HttpError as e:
+                    status, extra, payload = e.status, {}, self._json({"error": str(e)})
+                keep_alive = headers.get("connection", "").lower() != "close"
+                await self._write_response(writer, status, extra, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader):
+        line = await reader.readline()
+        if not line:
+            return None
+        try:
+            method, target, _ = line.decode('latin-1').split(" ", 2)
+        except ValueError:
+            return None
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode('latin-1').partition(":")
+            headers[name.strip().lower()] = value.strip()
+        length = headers.get("content-length") or "0"
+        if not (length.isascii() and length.isdigit()):
+            raise HttpError(HTTPStatus.BAD_REQUEST, "Content-Length 값이 올바르지 않습니다.")
+        length = int(length)
+        if length > MAX_BODY:
+            return None
+        body = await reader.readexactly(length) if length else b""
+        return method.upper(), target, headers, body
+
+    async def _write_response(self, writer, status, extra, payload, keep_alive):
+        content_type, body = payload if payload else (None, b"")
+        lines = [f"HTTP/1.1 {status.value} {status.phrase}"]
+        if content_type:
+            lines.append(f"Content-Type: {content_type}")
+        lines.append(f"Content-Length: {len(body)}")
+        lines.append(f"Connection: {'keep-alive' if keep_alive else 'close'}")
+        lines.extend(f"{name}: {value}" for name, value in extra.items())
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode('latin-1') + body)
+        await writer.drain()
+
+    @staticmethod
+    def _json(obj):
+        return ("application/json; charset=utf-8", json.dumps(obj, ensure_ascii=False).encode('utf-8'))
+
+    def dispatch(self, method, target, headers, body):
+        url = urlsplit(target)
+        query = parse_qs(url.query)
+        if method == "GET" and url.path in ("/", "/index.html"):
+            return HTTPStatus.OK, {}, ("text/html; charset=utf-8", self.index_html)
+        if method == "GET" and url.path == "/routines":
+            return self.list_routines(self._param(query, "date", today()), headers)
+        if method == "POST" and url.path == "/routine/update":
+            return self.update_routine(_form(body))
+        if method == "POST" and url.path == "/routine/delete":
+            return self.delete_routine(_form(body))
+        raise HttpError(HTTPStatus.NOT_FOUND)
+
+    @staticmethod
+    def _param(params, name, default=None):
+        values = params.get(name)
+        if values:
+            return values[0]
+        if default is None:
+            raise HttpError(HTTPStatus.BAD_REQUEST, f"{name} 값이 필요합니다.")
+        return default
+
+    def list_routines(self, day, headers):
+        _check_date(day)
+        etag = self.etag(day)
+        if headers.get("if-none-match") == etag:
+            return HTTPStatus.NOT_MODIFIED, {"ETag": etag}, None
+        cached = self._cache.get(day)
+        if cached is None or cached[0] != etag:
+            routines = self.store.routines_on(day)
+            cached = self._cache[day] = (etag, self._json([_to_json(r, occurrence_completed(self.store, r, day)) for r in routines]))
+            if len(self._cache) > CACHE_SIZE:
+                self._cache.popitem(last=False)
+        self._cache.move_to_end(day)
+        return HTTPStatus.OK, {"ETag": etag, "Cache-Control": "no-cache"}, cached[1]
+
+    # 목록의 name은 이 날짜의 발생 내용이므로 발생과 비교하고,
+    # 이 날짜에 바뀐 발생이 있으면 이름도 그 발생에만 반영
+    def update_routine(self, form):
+        routine = self._find(form)
+        day = self._param(form, "date", today())
+        _check_date(day)
+        origin = occurrence_origin(routine, day) if matches(routine, day) else day
+        occurrence = routine.on(origin)
+        name = self._param(form, "name", occurrence.content)
+        if name != occurrence.content:
+            if occurrence is not routine:
+                routine = self.store.override_occurrence(routine.id, day, content=name)
+            else:
+                routine = self.store.update_routine(routine.id, content=name)
+        done = self._param(form, "is_completed", "false").lower() in ("true", "1", "on")
+        if done != is_completed(routine, day):
+            try:
+                routine = self.store.set_completed(routine.id, day, done)
+            except ValueError as e:
+                raise HttpError(HTTPStatus.BAD_REQUEST, str(e))
+        return HTTPStatus.OK, {}, self._json(_to_json(routine.on(origin), is_completed(routine, day)))
+
+    def delete_routine(self, form):
+        routine = self._find(form)
+        self.store.delete_routine(routine.id)
+        return HTTPStatus.OK, {}, self._json({"id": routine.id, "deleted": True})
+
+    def _find(self, form):
+        routine = self.store.get(self._param(form, "id"))
+        if routine is None:
+            raise HttpError(HTTPStatus.NOT_FOUND, "루틴을 찾을 수 없습니다.")
+        return routine
+
+
+def today():
+    return datetime.now().strftime("%Y-%m-%d")
+
+
+def _form(body):
+    try:
+        return parse_qs(body.decode('utf-8'), errors='strict')
+    except UnicodeDecodeError:
+        raise HttpError(HTTPStatus.BAD_REQUEST, "요청 본문이 UTF-8이 아닙니다.")
+
+
+def _check_date(day):
+    try:
+        datetime.strptime(day, "%Y-%m-%d")
+    except ValueError:
+        raise HttpError(HTTPStatus.BAD_REQUEST, "날짜 형식이 올바르지 않습니다.")
+
+
+# index.html이 기대하는 형태 (id, name, is_completed)
+# done: 그날의 완료 여부 (발생 복사본이 아닌 시리즈에서 읽은 값)
+def _to_json(routine, done):
+    return {
+        "id": routine.id,
+        "name": routine.content,
+        "is_completed": done,
+        "time": routine.time,
+        "frequency": routine.frequency,
+    }
+
+
+async def serve(host, port, data_file):
+    store = RoutineStore(data_file, write_delay=WRITE_DELAY)
+    app = RoutineServer(store)
+    server = await asyncio.start_server(app.handle, host, port)
+    print(f"http://{host}:{port}/ 에서 실행 중")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await asyncio.to_thread(store.flush)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="루틴 관리 로컬 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--data", default=DATA_FILE)
+    args = parser.parse_args(argv)
+    instrument.configure_from_env()
+    try:
+        asyncio.run(serve(args.host, args.port, args.data))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
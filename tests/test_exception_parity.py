@@ -0,0 +1,188 @@
+import io
+from collections import Counter
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from routine_core import RoutineStore, ics
+from routine_core.completion import is_completed, occurrence_completed, schedule_mask
+from routine_core.date_cache import DateCache
+from routine_core.model import Routine, make_routine
+from routine_core.recurrence import matches, occurrence_origin
+from routine_core.reminders import next_occurrence, occurrence_at
+
+# 반복 예외(건너뛰기/바꾸기/옮기기)를 다루는 경로마다 matches()/Routine.on()과 같은 결과를 내는지 확인
+
+START = date(2024, 1, 1)
+END = date(2024, 4, 30)
+DAYS = [(START + timedelta(days=offset)).isoformat() for offset in range((END - START).days + 1)]
+
+# 완료 표시할 (내용, 날짜): 바꾼 발생, 옮겨 온 발생, 예외 없는 발생
+COMPLETED = [("Run", "2024-01-12"), ("Gym", "2024-01-18"), ("Run", "2024-01-13"), ("Read", "2024-02-01")]
+
+
+def build(store):
+    run = store.add_routine(make_routine("07:00", "Run", "daily", "2024-01-05"))
+    store.skip_occurrence(run.id, "2024-01-10")
+    store.override_occurrence(run.id, "2024-01-12", time="18:00")
+    store.override_occurrence(run.id, "2024-01-15", content="Swim")
+    store.skip_occurrence(run.id, "2024-02-02")
+    store.override_occurrence(run.id, "2024-02-01", date="2024-02-02", time="06:00")
+
+    gym = store.add_routine(make_routine("19:30", "Gym", "weekly", "2024-01-03"))
+    store.override_occurrence(gym.id, "2024-01-17", date="2024-01-18", time="08:00")
+    store.skip_occurrence(gym.id, "2024-02-07")
+    store.override_occurrence(gym.id, "2024-02-14", date="2024-02-12")
+
+    rent = store.add_routine(make_routine("09:00", "Rent", "monthly", "2024-01-31"))
+    store.override_occurrence(rent.id, "2024-03-31", date="2024-04-01", content="Rent (late)")
+
+    dentist = store.add_routine(make_routine("15:00", "Dentist", "once", "2024-01-08"))
+    store.update_routine(dentist.id, dates=["2024-01-08", "2024-02-08", "2024-03-08"])
+    store.skip_occurrence(dentist.id, "2024-02-08")
+    store.override_occurrence(dentist.id, "2024-03-08", time="10:00")
+
+    store.add_routine(make_routine("22:00", "Read", "daily", "2024-01-01"))
+
+
+def complete(store):
+    by_content = {routine.content: routine for routine in store.routines}
+    for content, day in COMPLETED:
+        store.set_completed(by_content[content].id, day, True)
+
+
+def expected(routines, day):
+    result = Counter()
+    for routine in routines:
+        if matches(routine, day):
+            occurrence = routine.on(occurrence_origin(routine, day))
+            result[(routine.id, occurrence.time, occurrence.content)] += 1
+    return result
+
+
+def rows(routines):
+    return Counter((routine.id, routine.time, routine.content) for routine in routines)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = RoutineStore(str(tmp_path / "data.json"))
+    build(store)
+    return store
+
+
+def test_recurrence_index(store):
+    for day in DAYS:
+        assert rows(store.routines_on(day)) == expected(store.routines, day), day
+
+
+def test_numpy_occurrences(store):
+    by_date = store.occurrences(DAYS[0], DAYS[-1]).by_date()
+    for day in DAYS:
+        assert rows(by_date.get(day, [])) == expected(store.routines, day), day
+
+
+def test_sqlite_routines_on(store, tmp_path):
+    db = RoutineStore(str(tmp_path / "data.db"))
+    with db.batch():
+        for routine in store.routines:
+            db.add_routine(Routine.from_dict(routine.to_dict()))
+    for day in DAYS:
+        assert rows(db.backend.routines_on(day)) == expected(store.routines, day), day
+    db.backend.close()
+
+
+def test_reminders(store):
+    end = datetime(END.year, END.month, END.day) + timedelta(days=1)
+    found = {day: Counter() for day in DAYS}
+    for routine in store.routines:
+        due = next_occurrence(routine, datetime(START.year, START.month, START.day) - timedelta(minutes=1))
+        while due is not None and due < end:
+            occurrence = occurrence_at(routine, due)
+            assert (due.hour * 60 + due.minute) == occurrence.minutes
+            found[due.date().isoformat()][(routine.id, occurrence.time, occurrence.content)] += 1
+            due = next_occurrence(routine, due)
+    for day in DAYS:
+        assert found[day] == expected(store.routines, day), day
+
+
+def test_schedule_mask(store):
+    for routine in store.routines:
+        base = date.fromordinal(routine.start)
+        length = (END - base).days + 1
+        mask = schedule_mask(routine, length)
+        for offset in range(length):
+            day = (base + timedelta(days=offset)).isoformat()
+            assert bool(mask >> offset & 1) == matches(routine, day), (routine.content, day)
+
+
+# 목록에 나오는 항목(캐시에 들어 있던 것 포함)의 완료 여부는 시리즈의 기록과 같아야 함
+def test_completion_read_from_series(store):
+    cache = DateCache(store)
+    for day in DAYS:
+        cache.get(day)
+    complete(store)
+    for day in DAYS:
+        for row in [*cache.get(day), *store.routines_on(day)]:
+            assert occurrence_completed(store, row, day) == is_completed(store.get(row.id), day), (row.content, day)
+
+
+# 다른 프로세스가 파일을 바꾸면 캐시에 있던 날짜도 다시 계산해야 함
+def test_date_cache_sees_external_changes(store):
+    cache = DateCache(store)
+    for day in DAYS:
+        cache.get(day)
+    other = RoutineStore(store.path)
+    gym = next(routine for routine in other.routines if routine.content == "Gym")
+    other.skip_occurrence(gym.id, "2024-01-24")
+    other.add_routine(make_routine("12:00", "Lunch", "weekly", "2024-01-02"))
+    for day in DAYS:
+        assert rows(cache.get(day)) == expected(other.routines, day), day
+
+
+def _content_rows(routines, day):
+    return Counter((routine.time, routine.content) for routine in routines
+                   if matches(routine, day) for routine in [routine.on(occurrence_origin(routine, day))])
+
+
+def test_ics_round_trip(store, tmp_path):
+    complete(store)
+    out = io.StringIO()
+    ics.write_ics(store.routines, out)
+    text = out.getvalue()
+
+    imported = RoutineStore(str(tmp_path / "imported.json"))
+    assert ics.import_ics(imported, io.StringIO(text)) == (len(store.routines), Counter())
+    # once 루틴의 건너뛴 날짜는 dates에서 빠진 형태로 돌아오므로 레코드 대신 날짜별 발생과 완료 여부를 비교
+    for day in DAYS:
+        assert rows(imported.routines_on(day)) == expected(store.routines, day), day
+        done = {routine.id for routine in store.routines if matches(routine, day) and is_completed(routine, day)}
+        assert {routine.id for routine in imported.routines
+                if matches(routine, day) and is_completed(routine, day)} == done, day
+
+    # 같은 파일을 다시 가져오면 UID가 모두 겹치므로 새 id를 받은 복사본이 하나씩 더 생김
+    assert ics.import_ics(imported, io.StringIO(text)) == (len(store.routines), Counter())
+    for day in DAYS:
+        doubled = Counter({key: count * 2 for key, count in _content_rows(store.routines, day).items()})
+        assert _content_rows(imported.routines, day) == doubled, day
+        assert Counter((r.time, r.content) for r in imported.routines_on(day)) == doubled, day
+
+
+def test_ics_repeated_uid(tmp_path):
+    def event(summary, day):
+        return f"BEGIN:VEVENT\r\nUID:X\r\nDTSTART:{day}T070000\r\nSUMMARY:{summary}\r\nEND:VEVENT\r\n"
+
+    text = "BEGIN:VCALENDAR\r\n" + event("A", "20250101") + event("B", "20250102") + event("C", "20250103") + \
+           "END:VCALENDAR\r\n"
+    store = RoutineStore(str(tmp_path / "data.json"))
+    store.add_routine(Routine("07:00", "Old", "daily", "2025-01-01", id="Y"))
+    assert ics.import_ics(store, io.StringIO(text)) == (3, Counter())
+    assert sorted(routine.content for routine in store.routines) == ["A", "B", "C", "Old"]
+    for day in ("2025-01-01", "2025-01-02", "2025-01-03"):
+        assert rows(store.routines_on(day)) == expected(store.routines, day)
+
+    # 파일에 원래 일정이 없는 RECURRENCE-ID는 이미 있던 루틴을 바꾸지 않음
+    orphan = ("BEGIN:VCALENDAR\r\nBEGIN:VEVENT\r\nUID:Y\r\nRECURRENCE-ID:20250105T070000\r\n"
+              "DTSTART:20250105T090000\r\nSUMMARY:Other\r\nEND:VEVENT\r\nEND:VCALENDAR\r\n")
+    assert ics.import_ics(store, io.StringIO(orphan)) == (0, Counter({"원래 일정 없음": 1}))
+    assert store.get("Y").overrides is None